@@ -0,0 +1,60 @@
+import frappe
+from frappe.utils import now_datetime
+
+
+def bulk_insert_child_rows(parent_doctype, parentfield, rows_by_parent):
+    """
+    Append child rows to existing parents without loading or saving the parents.
+
+    Continues each parent's idx sequence (one grouped MAX(idx) query) and writes
+    every row with a single bulk insert. Parent `modified` is not touched; callers
+    update the parent header themselves.
+
+    Args:
+        parent_doctype (str): e.g. "Space Plan"
+        parentfield (str): table fieldname on the parent, e.g. "item_table"
+        rows_by_parent (dict): parent name -> list of row dicts (child column -> value)
+
+    Returns:
+        dict: parent name -> list of inserted child row names
+    """
+    rows_by_parent = {parent: rows for parent, rows in rows_by_parent.items() if rows}
+    if not rows_by_parent:
+        return {}
+
+    child_doctype = frappe.get_meta(parent_doctype).get_field(parentfield).options
+    last_idx = dict(frappe.db.sql(f"""
+        SELECT parent, MAX(idx)
+        FROM `tab{child_doctype}`
+        WHERE parenttype = %(parenttype)s AND parentfield = %(parentfield)s AND parent IN %(parents)s
+        GROUP BY parent
+    """, {
+        "parenttype": parent_doctype,
+        "parentfield": parentfield,
+        "parents": tuple(rows_by_parent)
+    }))
+
+    data_fields = sorted({key for rows in rows_by_parent.values() for row in rows for key in row})
+    fields = [
+        "name", "parent", "parenttype", "parentfield", "idx",
+        "owner", "creation", "modified", "modified_by", "docstatus"
+    ] + data_fields
+
+    timestamp = now_datetime()
+    user = frappe.session.user
+    values = []
+    inserted = {}
+    for parent, rows in rows_by_parent.items():
+        idx = last_idx.get(parent) or 0
+        names = inserted[parent] = []
+        for row in rows:
+            idx += 1
+            name = frappe.generate_hash(length=10)
+            names.append(name)
+            values.append(
+                [name, parent, parent_doctype, parentfield, idx, user, timestamp, timestamp, user, 0]
+                + [row.get(field) for field in data_fields]
+            )
+
+    frappe.db.bulk_insert(child_doctype, fields, values)
+    return inserted
@@ -0,0 +1,23 @@
+import base64
+import json
+
+# Opaque keyset-pagination cursors: (sort value, name) as url-safe base64 JSON
+
+
+def encode_cursor(sort_value, name):
+    payload = json.dumps([sort_value, name], default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    {'value', 'name'} for a cursor from encode_cursor, None when empty.
+    Raises ValueError for a malformed cursor.
+    """
+    if not cursor:
+        return None
+    try:
+        sort_value, name = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return {'value': sort_value, 'name': name}
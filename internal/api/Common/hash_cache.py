@@ -0,0 +1,11 @@
+import frappe
+
+# Per-record entries kept as fields of one redis hash (lead attachments, lead_name -> lead id)
+
+
+def delete_hash_fields(name, fields):
+    """Drop `fields` from the redis hash `name` in one HDEL; empty fields and duplicates are skipped"""
+    fields = list(dict.fromkeys(field for field in fields if field))
+    if fields:
+        # RedisWrapper.hdel takes the fields as one list; its next argument is `shared`
+        frappe.cache().hdel(name, fields)
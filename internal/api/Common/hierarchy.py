@@ -0,0 +1,48 @@
+import frappe
+
+from internal.api.Common.versioned_cache import get_versioned_value, invalidate_versioned_value
+
+# user_id -> manager's user_id for every Employee, built in one query
+MANAGER_MAP_KEY = "internal_employee_manager_map"
+
+
+def _build_manager_map():
+    rows = frappe.db.sql("""
+        SELECT e.user_id, m.user_id
+        FROM `tabEmployee` e
+        LEFT JOIN `tabEmployee` m ON m.name = e.reports_to
+        WHERE IFNULL(e.user_id, '') != ''
+    """)
+    return {user: manager for user, manager in rows if manager}
+
+
+def get_manager_map():
+    return get_versioned_value(MANAGER_MAP_KEY, _build_manager_map)
+
+
+def get_manager(user):
+    """Manager's user_id for `user`, or None"""
+    return get_manager_map().get(user)
+
+
+def get_reporting_chain(user):
+    """Managers above `user`, nearest first (stops on cycles)"""
+    manager_map = get_manager_map()
+    chain = []
+    seen = {user}
+    manager = manager_map.get(user)
+    while manager and manager not in seen:
+        chain.append(manager)
+        seen.add(manager)
+        manager = manager_map.get(manager)
+    return chain
+
+
+def invalidate_manager_map(doc=None, method=None):
+    """doc_events hook for Employee (on_change / on_trash)"""
+    invalidate_versioned_value(MANAGER_MAP_KEY)
+
+
+@frappe.whitelist()
+def get_my_reporting_chain():
+    return get_reporting_chain(frappe.session.user)
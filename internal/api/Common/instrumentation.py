@@ -0,0 +1,183 @@
+import functools
+import time
+from bisect import bisect_left
+from datetime import timedelta
+
+import frappe
+from frappe.utils import now_datetime
+from internal.api.Common.loginRole import get_user_roles
+
+# Per-endpoint query count, DB time, Python time and payload size for every
+# whitelisted method of this app, recorded by the before_request / after_request hooks.
+#
+# Each request adds one sample per metric to a bucketed histogram in an hourly redis
+# hash (one pipelined round trip). Hashes expire after ROLLING_HOURS, so the
+# histograms always cover a rolling window. Percentiles are read back from the bucket
+# upper bounds, which is precise enough to spot regressions.
+
+METHOD_PREFIX = "internal."
+METRICS_KEY = "internal_api_metrics:{0}"
+ROLLING_HOURS = 24
+
+# metric -> ascending bucket upper bounds (a final overflow bucket is implied)
+METRIC_BUCKETS = {
+    "total_ms": [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000],
+    "db_ms": [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000],
+    "python_ms": [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000],
+    "queries": [1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377, 610, 1000],
+    "payload_bytes": [256 * 4 ** i for i in range(10)]
+}
+PERCENTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+
+def _hour_key(moment):
+    return frappe.cache().make_key(METRICS_KEY.format(moment.strftime("%Y%m%d%H")))
+
+
+def _request_method():
+    path = frappe.request.path if getattr(frappe.local, "request", None) else ""
+    if "/method/" not in path:
+        return None
+    method = path.split("/method/", 1)[1].strip("/")
+    return method if method.startswith(METHOD_PREFIX) else None
+
+
+def _install_sql_timer(db_class):
+    """
+    Wrap db_class.sql once per process. The wrapper only counts while a request has
+    metrics state on frappe.local, so nothing has to be restored per request and
+    instance-level patches (e.g. the benchmarks' count_queries) stack on top of it.
+    """
+    sql = db_class.sql
+    if getattr(sql, "internal_api_timer", False):
+        return
+
+    @functools.wraps(sql)
+    def timed_sql(self, *args, **kwargs):
+        state = getattr(frappe.local, "internal_api_metrics", None)
+        if not state:
+            return sql(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return sql(self, *args, **kwargs)
+        finally:
+            state["queries"] += 1
+            state["db_time"] += time.perf_counter() - start
+
+    timed_sql.internal_api_timer = True
+    db_class.sql = timed_sql
+
+
+def start_request():
+    """before_request hook: time the request and every query sent through frappe.db.sql"""
+    frappe.local.internal_api_metrics = None
+    method = _request_method()
+    if not method or not getattr(frappe.local, "db", None):
+        return
+
+    _install_sql_timer(type(frappe.db))
+    frappe.local.internal_api_metrics = {
+        "method": method,
+        "start": time.perf_counter(),
+        "queries": 0,
+        "db_time": 0.0
+    }
+
+
+def record_request(response=None, request=None):
+    """after_request hook: add the request to the histograms"""
+    state = getattr(frappe.local, "internal_api_metrics", None)
+    if not state:
+        return
+    frappe.local.internal_api_metrics = None
+
+    total = time.perf_counter() - state["start"]
+    payload = 0
+    if response is not None and not response.is_streamed:
+        payload = response.content_length or len(response.get_data())
+
+    try:
+        record_sample(state["method"], {
+            "total_ms": total * 1000,
+            "db_ms": state["db_time"] * 1000,
+            "python_ms": (total - state["db_time"]) * 1000,
+            "queries": state["queries"],
+            "payload_bytes": payload
+        })
+    except Exception:
+        # instrumentation must never fail a request
+        pass
+
+
+def record_sample(method, sample):
+    key = _hour_key(now_datetime())
+    pipe = frappe.cache().pipeline()
+    pipe.hincrby(key, f"{method}|count", 1)
+    for metric, value in sample.items():
+        bucket = bisect_left(METRIC_BUCKETS[metric], value)
+        pipe.hincrby(key, f"{method}|{metric}|{bucket}", 1)
+        pipe.hincrbyfloat(key, f"{method}|{metric}|sum", value)
+    pipe.expire(key, (ROLLING_HOURS + 1) * 60 * 60)
+    pipe.execute()
+
+
+def _percentile(bounds, counts, total, pct):
+    """Upper bound of the bucket holding the pct-th sample (last bound for the overflow bucket)"""
+    target = pct * total
+    seen = 0
+    for index, count in enumerate(counts):
+        seen += count
+        if seen >= target:
+            return bounds[min(index, len(bounds) - 1)]
+    return bounds[-1]
+
+
+def get_metrics(hours=ROLLING_HOURS, method=None):
+    """
+    Merged histograms for the last `hours` hours.
+
+    Returns:
+        dict: method -> {count, <metric>: {mean, p50, p95, p99}}
+    """
+    current = now_datetime()
+    pipe = frappe.cache().pipeline()
+    for offset in range(hours):
+        pipe.hgetall(_hour_key(current - timedelta(hours=offset)))
+
+    merged = {}
+    for hour in pipe.execute():
+        for field, value in hour.items():
+            field = field.decode() if isinstance(field, bytes) else field
+            merged[field] = merged.get(field, 0) + float(value)
+
+    methods = {
+        field.split("|", 1)[0] for field in merged
+        if field.endswith("|count") and (not method or field.split("|", 1)[0] == method)
+    }
+    result = {}
+    for name in sorted(methods):
+        count = int(merged[f"{name}|count"])
+        stats = result[name] = {"count": count}
+        for metric, bounds in METRIC_BUCKETS.items():
+            counts = [merged.get(f"{name}|{metric}|{index}", 0) for index in range(len(bounds) + 1)]
+            stats[metric] = {
+                "mean": round(merged.get(f"{name}|{metric}|sum", 0) / count, 2),
+                **{label: _percentile(bounds, counts, count, pct) for label, pct in PERCENTILES.items()}
+            }
+    return result
+
+
+@frappe.whitelist()
+def get_api_metrics(hours=ROLLING_HOURS, method=None):
+    """p50/p95/p99 of latency, DB time, query count and payload per internal API method (TLs only)"""
+    user = frappe.session.user
+    roles = get_user_roles([user])[user]
+    if user != "Administrator" and not any(role["role_type"] == "tl" for role in roles):
+        frappe.throw("Only team leads can view API metrics", frappe.PermissionError)
+
+    hours = min(max(int(hours), 1), ROLLING_HOURS)
+    return {
+        "success": True,
+        "hours": hours,
+        "data": get_metrics(hours, method)
+    }
@@ -1,47 +1,74 @@
 import frappe
+import json
+
+# user -> [{department, role_type}], invalidated whenever an Internal App Role changes
+ROLES_CACHE = "internal_login_roles"
+
+# User Child parentfield on Internal App Role -> role_type returned to the app
+ROLE_TYPES = {"user": "user", "tls": "tl"}
+
+
+def _fetch_roles(users):
+    """
+    Department + role_type for many users in one joined query.
+    Regular user rows come before TL rows, each ordered like the old per-table lookups.
+    """
+    roles = {user: [] for user in users}
+    rows = frappe.db.sql("""
+        SELECT DISTINCT
+            uc.user_link,
+            uc.parentfield,
+            r.name,
+            r.department,
+            r.modified
+        FROM `tabUser Child` uc
+        JOIN `tabInternal App Role` r ON r.name = uc.parent
+        WHERE
+            uc.user_link IN %(users)s
+            AND uc.parentfield IN ('user', 'tls')
+        ORDER BY uc.parentfield = 'tls', r.modified DESC
+    """, {"users": tuple(users)}, as_dict=True)
+    for row in rows:
+        roles[row.user_link].append({
+            "department": row.department,
+            "role_type": ROLE_TYPES[row.parentfield]
+        })
+    return roles
+
+
+def get_user_roles(users):
+    """
+    Roles for many users, served from the per-user cache where possible
+
+    Returns:
+        dict: user -> [{department, role_type}]
+    """
+    cache = frappe.cache()
+    result = {}
+    missing = []
+    for user in users:
+        roles = cache.hget(ROLES_CACHE, user)
+        if roles is None:
+            missing.append(user)
+        else:
+            result[user] = roles
+
+    if missing:
+        for user, roles in _fetch_roles(missing).items():
+            cache.hset(ROLES_CACHE, user, roles)
+            result[user] = roles
+    return result
+
+
+def invalidate_roles(doc=None, method=None):
+    """doc_events hook for Internal App Role (on_change / on_trash)"""
+    frappe.cache().delete_value(ROLES_CACHE)
+
 
 @frappe.whitelist()
 def loginUser_roles(loginUser):
     try:
-        result = []
-
-        # 1. Check if user is a regular user in any department
-        user_children = frappe.get_all(
-            "User Child",
-            filters={"user_link": loginUser, "parentfield": "user"},
-            fields=["parent"]
-        )
-        parent_names = [uc["parent"] for uc in user_children]
-        if parent_names:
-            roles = frappe.get_all(
-                "Internal App Role",
-                filters={"name": ["in", parent_names]},
-                fields=["name", "department"]
-            )
-            for role in roles:
-                result.append({
-                    "department": role["department"],
-                    "role_type": "user"
-                })
-
-        # 2. Check if user is a TL/Executive in any department (tls table)
-        tl_children = frappe.get_all(
-            "User Child",
-            filters={"user_link": loginUser, "parentfield": "tls"},
-            fields=["parent"]
-        )
-        tl_parent_names = [tc["parent"] for tc in tl_children]
-        if tl_parent_names:
-            tl_roles = frappe.get_all(
-                "Internal App Role",
-                filters={"name": ["in", tl_parent_names]},
-                fields=["name", "department"]
-            )
-            for role in tl_roles:
-                result.append({
-                    "department": role["department"],
-                    "role_type": "tl"
-                })
+        result = get_user_roles([loginUser])[loginUser]
 
         if not result:
             return {
@@ -58,4 +85,24 @@ def loginUser_roles(loginUser):
             "error": True,
             "message": f"An error occurred: {str(e)}"
         }
-    
\ No newline at end of file
+
+
+@frappe.whitelist()
+def bulk_user_roles(users):
+    """
+    Roles for a list of users (TL team views)
+    Returns: {error: bool, roles: {user: [{department, role_type}]}}
+    """
+    try:
+        if isinstance(users, str):
+            users = json.loads(users)
+        return {
+            "error": False,
+            "roles": get_user_roles(list(dict.fromkeys(users or [])))
+        }
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "bulk_user_roles Error")
+        return {
+            "error": True,
+            "message": f"An error occurred: {str(e)}"
+        }
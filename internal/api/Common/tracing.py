@@ -0,0 +1,85 @@
+import json
+
+import frappe
+from frappe.utils import now
+
+# Structured, level-gated tracing for the internal app.
+#
+# trace() only appends to a per-request buffer; events below the configured level
+# (site config key `internal_trace_level`, default "warning") are dropped on the spot.
+# The buffer is flushed once per request/job by the after_request / after_job hooks,
+# which hand it to a background job that writes to the `internal.trace` log file.
+# Error-level events are additionally collapsed into a single Error Log row per flush.
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+DEFAULT_LEVEL = "warning"
+MAX_BUFFERED_EVENTS = 200
+
+
+def get_trace_level():
+    level = frappe.conf.get("internal_trace_level") or DEFAULT_LEVEL
+    return LEVELS.get(level, LEVELS[DEFAULT_LEVEL])
+
+
+def trace(event, level="debug", **fields):
+    """Record a structured event if `level` is at or above the configured trace level"""
+    if LEVELS[level] < get_trace_level():
+        return
+
+    buffer = getattr(frappe.local, "internal_trace_buffer", None)
+    if buffer is None:
+        buffer = frappe.local.internal_trace_buffer = []
+    if len(buffer) >= MAX_BUFFERED_EVENTS:
+        return
+
+    buffer.append({
+        "event": event,
+        "level": level,
+        "timestamp": now(),
+        "user": frappe.session.user if getattr(frappe.local, "session", None) else None,
+        "fields": fields,
+    })
+
+
+def _take_buffer():
+    events = getattr(frappe.local, "internal_trace_buffer", None)
+    frappe.local.internal_trace_buffer = []
+    return events or []
+
+
+def flush_after_request(response=None, request=None):
+    """after_request hook: hand buffered events to a background writer"""
+    events = _take_buffer()
+    if not events:
+        return
+    try:
+        frappe.enqueue(
+            "internal.api.Common.tracing.write_events",
+            queue="short",
+            events=events,
+        )
+    except Exception:
+        # tracing must never fail a request
+        pass
+
+
+def flush_after_job(*args, **kwargs):
+    """after_job hook: already off the request path, write directly"""
+    events = _take_buffer()
+    if events:
+        write_events(events)
+
+
+def write_events(events):
+    logger = frappe.logger("internal.trace", allow_site=True)
+    errors = []
+    for event in events:
+        logger.log(LEVELS[event["level"]], json.dumps(event, default=str))
+        if event["level"] == "error":
+            errors.append(event)
+
+    if errors:
+        frappe.log_error(
+            title=f"Internal app: {errors[0]['event']}",
+            message=json.dumps(errors, indent=1, default=str),
+        )
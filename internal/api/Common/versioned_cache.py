@@ -0,0 +1,47 @@
+import frappe
+
+# Values shared by all workers through redis and also kept in-process per site.
+# Each key has a version token stored next to it in redis; the in-process copy is
+# reused while its version still matches, so a hot read costs one small redis GET
+# instead of fetching and unpickling the whole value.
+
+_local_values = {}
+
+
+def _version_key(key):
+    return f"{key}_version"
+
+
+def get_versioned_value(key, build, version_of=None):
+    """
+    Value cached under `key`, built with `build()` when missing from redis.
+
+    Args:
+        key (str): redis key (site-prefixed by frappe.cache)
+        build (callable): returns the value to cache
+        version_of (callable): value -> version token; a random token when omitted
+    """
+    cache = frappe.cache()
+    local_key = (frappe.local.site, key)
+    version = cache.get_value(_version_key(key))
+
+    local = _local_values.get(local_key)
+    if version and local and local[0] == version:
+        return local[1]
+
+    value = cache.get_value(key) if version else None
+    if value is None:
+        value = build()
+        version = version_of(value) if version_of else frappe.generate_hash(length=12)
+        cache.set_value(key, value)
+        cache.set_value(_version_key(key), version)
+
+    _local_values[local_key] = (version, value)
+    return value
+
+
+def invalidate_versioned_value(key):
+    cache = frappe.cache()
+    cache.delete_value(_version_key(key))
+    cache.delete_value(key)
+    _local_values.pop((frappe.local.site, key), None)
@@ -1,5 +1,24 @@
 import frappe
-from collections import defaultdict
+from frappe.utils import cint
+from internal.api.Common.cursor import decode_cursor, encode_cursor
+from internal.api.Departments.bdm.leads.attachments import format_file_size, get_lead_attachments
+from internal.api.Departments.bdm.leads.billing import (
+    AMENITIES_TABLE,
+    SEATS_TABLE,
+    empty_totals,
+    get_billing_totals,
+    grouped_totals_sql
+)
+from internal.api.Departments.bdm.leads.cache import get_cached_projection
+from internal.api.Departments.bdm.leads.projection import get_lead_projection
+
+CLIENT_LIST_FIELDS = [
+    'name', 'name1', 'mobile_phone', 'primary_email', 'leasing_status',
+    'assignedto', 'secondary_email', 'whatsapp_link_1', 'whatsapp_link_2'
+]
+CLIENT_SEARCH_FIELDS = ['name1', 'company', 'mobile_phone']
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
 
 @frappe.whitelist()
 def get_clients_for_user():
@@ -12,79 +31,184 @@ def get_clients_for_user():
             'leasing_status': 'Client',
             'assignedto': user
         },
-        fields=[
-            'name', 'name1', 'mobile_phone', 'primary_email', 'leasing_status',
-             'assignedto', 'secondary_email', 'whatsapp_link_1', 'whatsapp_link_2'
-        ]
+        fields=CLIENT_LIST_FIELDS
     )
     
     if not leads:
         return []
     
-    results = []
-    for lead in leads:
-        try:
-            # Get the full lead document to access child tables for billing info
-            lead_doc = frappe.get_doc('Leads', lead['name'])
-            
-            name = lead.get('name1') or ''
-            initials = ''.join([part[0].upper() for part in name.split() if part])[:2]
-            contact = lead.get('mobile_phone') or lead.get('primary_email') or ''
-            
-            # Calculate seats info from child table
-            seats_count = 0
-            total_seats_amount = 0
-            if hasattr(lead_doc, 'item') and lead_doc.item:
-                for item in lead_doc.item:
-                    seats_count += item.get('qty', 0) or 0
-                    total_seats_amount += item.get('amount', 0) or 0
-            
-            # Calculate amenities info from child table
-            amenities_count = 0
-            total_amenities_amount = 0
-            if hasattr(lead_doc, 'amenity_recursion') and lead_doc.amenity_recursion:
-                for amenity in lead_doc.amenity_recursion:
-                    amenities_count += amenity.get('qty', 0) or 0
-                    total_amenities_amount += amenity.get('amount', 0) or 0
-            
-            total_billed_items = seats_count + amenities_count
-            total_amount = total_seats_amount + total_amenities_amount
-            
-            results.append({
-                'id': lead['name'],
-                'leadId': lead['name'],
-                'name': lead.get('name1', ''),
-                'contact': contact,
-                'status': lead.get('leasing_status', ''),
-                'initials': initials,
-                'billedItemsCount': total_billed_items,
-                'seatsCount': seats_count,
-                'amenitiesCount': amenities_count,
-                'totalAmount': total_amount,
-                'totalSeatsAmount': total_seats_amount,
-                'totalAmenitiesAmount': total_amenities_amount,
-                'agreement': lead.get('agreement', ''),
-                # Basic details
-                'company': lead.get('company', ''),
-                'assigned_to': lead.get('assignedto', ''),
-                'managed_by': lead.get('managed_by', ''),
-                'primary_email': lead.get('primary_email', ''),
-                'secondary_email': lead.get('secondary_email', ''),
-                'mobile_phone': lead.get('mobile_phone', ''),
-                'alternative_number': lead.get('alternative_number', ''),
-                'whatsapp_link_1': lead.get('whatsapp_link_1', ''),
-                'whatsapp_link_2': lead.get('whatsapp_link_2', ''),
-                'lead_title': lead.get('lead_title', ''),
-                'building': lead.get('building', ''),
-                'floor': lead.get('floor', ''),
-                'nearby': lead.get('nearby', '')
-            })
-        except Exception as e:
-            # Log error and continue with other leads
-            print(f"Error processing lead {lead['name']}: {str(e)}")
-            continue
+    # Seat/amenity totals for every lead in one grouped query per child table
+    totals = get_billing_totals([lead['name'] for lead in leads])
+    
+    return [build_client_row(lead, totals[lead['name']]) for lead in leads]
+
+def build_client_row(lead, lead_totals):
+    """
+    Shape one client list row from a Leads record and its billing totals
+    """
+    name = lead.get('name1') or ''
+    initials = ''.join([part[0].upper() for part in name.split() if part])[:2]
+    contact = lead.get('mobile_phone') or lead.get('primary_email') or ''
+    
+    seats_count = lead_totals['seats_qty']
+    total_seats_amount = lead_totals['seats_amount']
+    amenities_count = lead_totals['amenities_qty']
+    total_amenities_amount = lead_totals['amenities_amount']
+    
+    total_billed_items = seats_count + amenities_count
+    total_amount = total_seats_amount + total_amenities_amount
     
-    return results
+    return {
+        'id': lead['name'],
+        'leadId': lead['name'],
+        'name': lead.get('name1', ''),
+        'contact': contact,
+        'status': lead.get('leasing_status', ''),
+        'initials': initials,
+        'billedItemsCount': total_billed_items,
+        'seatsCount': seats_count,
+        'amenitiesCount': amenities_count,
+        'totalAmount': total_amount,
+        'totalSeatsAmount': total_seats_amount,
+        'totalAmenitiesAmount': total_amenities_amount,
+        'agreement': lead.get('agreement', ''),
+        # Basic details
+        'company': lead.get('company', ''),
+        'assigned_to': lead.get('assignedto', ''),
+        'managed_by': lead.get('managed_by', ''),
+        'primary_email': lead.get('primary_email', ''),
+        'secondary_email': lead.get('secondary_email', ''),
+        'mobile_phone': lead.get('mobile_phone', ''),
+        'alternative_number': lead.get('alternative_number', ''),
+        'whatsapp_link_1': lead.get('whatsapp_link_1', ''),
+        'whatsapp_link_2': lead.get('whatsapp_link_2', ''),
+        'lead_title': lead.get('lead_title', ''),
+        'building': lead.get('building', ''),
+        'floor': lead.get('floor', ''),
+        'nearby': lead.get('nearby', '')
+    }
+
+@frappe.whitelist()
+def get_clients_page(cursor=None, page_size=DEFAULT_PAGE_SIZE, search=None, sort_by='modified', sort_order='desc'):
+    """
+    Paginated, server-filtered variant of get_clients_for_user.
+
+    Args:
+        cursor (str): `nextCursor` from the previous page; omit for the first page
+        page_size (int): rows per page, capped at MAX_PAGE_SIZE
+        search (str): matched against name1, company and mobile_phone
+        sort_by (str): 'modified' or 'totalAmount'
+        sort_order (str): 'asc' or 'desc'
+
+    Returns:
+        dict: {success, data, nextCursor, total}; `total` is only counted for the first page
+    """
+    page_size = min(max(cint(page_size) or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    if sort_by not in ('modified', 'totalAmount'):
+        return {'success': False, 'message': f'Unsupported sort_by: {sort_by}'}
+    descending = (sort_order or 'desc').lower() != 'asc'
+
+    try:
+        after = decode_cursor(cursor)
+    except ValueError:
+        return {'success': False, 'message': 'Invalid cursor'}
+
+    values = {
+        'user': frappe.session.user,
+        'limit': page_size + 1
+    }
+    conditions = ["l.leasing_status = 'Client'", 'l.assignedto = %(user)s']
+    if search:
+        values['search'] = f'%{search}%'
+        conditions.append('({0})'.format(' OR '.join(
+            f'l.{field} LIKE %(search)s' for field in CLIENT_SEARCH_FIELDS
+        )))
+    where = ' AND '.join(conditions)
+
+    if sort_by == 'modified':
+        rows = _clients_by_modified(where, values, after, descending)
+        sort_key = 'modified'
+    else:
+        rows = _clients_by_total_amount(where, values, after, descending)
+        sort_key = 'total_amount'
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = encode_cursor(rows[-1][sort_key], rows[-1]['name']) if has_more else None
+
+    if sort_by == 'modified':
+        totals = get_billing_totals([row['name'] for row in rows])
+    else:
+        totals = {row['name']: _totals_from_row(row) for row in rows}
+
+    total = None
+    if not cursor:
+        total = frappe.db.sql(f'SELECT COUNT(*) FROM `tabLeads` l WHERE {where}', values)[0][0]
+
+    return {
+        'success': True,
+        'data': [build_client_row(row, totals[row['name']]) for row in rows],
+        'nextCursor': next_cursor,
+        'total': total
+    }
+
+def _keyset_condition(column, after, descending):
+    """
+    (column, name) strictly past the cursor in the requested direction
+    """
+    if not after:
+        return ''
+    op = '<' if descending else '>'
+    return f'AND ({column} {op} %(after_value)s OR ({column} = %(after_value)s AND name {op} %(after_name)s))'
+
+def _clients_by_modified(where, values, after, descending):
+    direction = 'DESC' if descending else 'ASC'
+    if after:
+        values.update({'after_value': after['value'], 'after_name': after['name']})
+    columns = ', '.join(f'l.{field}' for field in CLIENT_LIST_FIELDS)
+    return frappe.db.sql(f"""
+        SELECT * FROM (
+            SELECT {columns}, l.modified
+            FROM `tabLeads` l
+            WHERE {where}
+        ) t
+        WHERE 1 = 1 {_keyset_condition('modified', after, descending)}
+        ORDER BY modified {direction}, name {direction}
+        LIMIT %(limit)s
+    """, values, as_dict=True)
+
+def _clients_by_total_amount(where, values, after, descending):
+    direction = 'DESC' if descending else 'ASC'
+    if after:
+        values.update({'after_value': after['value'], 'after_name': after['name']})
+    columns = ', '.join(f'l.{field}' for field in CLIENT_LIST_FIELDS)
+    user_leads = f'(SELECT l.name FROM `tabLeads` l WHERE {where})'
+    return frappe.db.sql(f"""
+        SELECT * FROM (
+            SELECT
+                {columns},
+                COALESCE(s.row_count, 0) AS seats_rows,
+                COALESCE(s.qty, 0) AS seats_qty,
+                COALESCE(s.amount, 0) AS seats_amount,
+                COALESCE(a.row_count, 0) AS amenities_rows,
+                COALESCE(a.qty, 0) AS amenities_qty,
+                COALESCE(a.amount, 0) AS amenities_amount,
+                COALESCE(s.amount, 0) + COALESCE(a.amount, 0) AS total_amount
+            FROM `tabLeads` l
+            LEFT JOIN ({grouped_totals_sql(SEATS_TABLE, user_leads)}) s ON s.parent = l.name
+            LEFT JOIN ({grouped_totals_sql(AMENITIES_TABLE, user_leads)}) a ON a.parent = l.name
+            WHERE {where}
+        ) t
+        WHERE 1 = 1 {_keyset_condition('total_amount', after, descending)}
+        ORDER BY total_amount {direction}, name {direction}
+        LIMIT %(limit)s
+    """, values, as_dict=True)
+
+def _totals_from_row(row):
+    totals = empty_totals()
+    for key in totals:
+        totals[key] = row[key]
+    return totals
 
 @frappe.whitelist()
 def get_client_details(lead_id):
@@ -92,64 +216,22 @@ def get_client_details(lead_id):
     Fetch detailed information for a specific client by lead ID
     """
     try:
-        # Check if lead exists
-        if not frappe.db.exists('Leads', lead_id):
+        # Lead header columns and child rows, served from cache while the lead is unchanged
+        projection = get_cached_projection(lead_id)
+        if not projection:
             return {
                 'success': False,
                 'message': f'Lead {lead_id} not found'
             }
         
-        # Get the lead document with all fields
-        lead_doc = frappe.get_doc('Leads', lead_id)
+        lead = projection['header']
+        seats_recursion = projection[SEATS_TABLE]
+        amenity_recursion = projection[AMENITIES_TABLE]
         
         # Basic client info
-        name = lead_doc.get('name1') or ''
+        name = lead.get('name1') or ''
         initials = ''.join([part[0].upper() for part in name.split() if part])[:2]
-        contact = lead_doc.get('mobile_phone') or lead_doc.get('primary_email') or ''
-        
-        # Get seats recursion (item table) with full details
-        seats_recursion = []
-        if hasattr(lead_doc, 'item') and lead_doc.item:
-            for item in lead_doc.item:
-                seats_recursion.append({
-                    'id': item.name,
-                    'type': 'Seat',
-                    'option': item.item_code or '',
-                    'quantity': item.qty or 0,
-                    'note': item.sales_description or '',
-                    'rate': item.rate or 0,
-                    'amount': item.amount or 0,
-                    'start_date': item.start_date,
-                    'stop_date': item.stop_date,
-                    'rollout_status': item.rollout_status,
-                    'floor': getattr(item, 'floor', ''),
-                    'novel_billing_entity': getattr(item, 'novel_billing_entity', ''),
-                    'billing_period': getattr(item, 'billing_period', ''),
-                    'deposit_amt': getattr(item, 'deposit_amt', 0),
-                    'deposit_months': getattr(item, 'deposit_months', 0)
-                })
-        
-        # Get amenity recursion with full details
-        amenity_recursion = []
-        if hasattr(lead_doc, 'amenity_recursion') and lead_doc.amenity_recursion:
-            for amenity in lead_doc.amenity_recursion:
-                amenity_recursion.append({
-                    'id': amenity.name,
-                    'type': 'Amenity',
-                    'option': amenity.item_code or '',
-                    'quantity': amenity.qty or 0,
-                    'note': amenity.sales_description or '',
-                    'rate': amenity.rate or 0,
-                    'amount': amenity.amount or 0,
-                    'start_date': amenity.start_date,
-                    'stop_date': amenity.stop_date,
-                    'rollout_status': amenity.rollout_status,
-                    'floor': getattr(amenity, 'floor', ''),
-                    'novel_billing_entity': getattr(amenity, 'novel_billing_entity', ''),
-                    'billing_period': getattr(amenity, 'billing_period', ''),
-                    'deposit_amt': getattr(amenity, 'deposit_amt', 0),
-                    'deposit_months': getattr(amenity, 'deposit_months', 0)
-                })
+        contact = lead.get('mobile_phone') or lead.get('primary_email') or ''
         
         # Calculate totals
         total_seats_amount = sum(item['amount'] for item in seats_recursion)
@@ -162,14 +244,14 @@ def get_client_details(lead_id):
             'leadId': lead_id,
             'name': name,
             'contact': contact,
-            'status': lead_doc.get('leasing_status', ''),
+            'status': lead.get('leasing_status', ''),
             'initials': initials,
-            'company': lead_doc.get('company', ''),
-            'lead_title': lead_doc.get('lead_title', ''),
-            'building': lead_doc.get('building', ''),
-            'floor': lead_doc.get('floor', ''),
-            'nearby': lead_doc.get('nearby', ''),
-            'agreement': lead_doc.get('agreement', ''),
+            'company': lead.get('company', ''),
+            'lead_title': lead.get('lead_title', ''),
+            'building': lead.get('building', ''),
+            'floor': lead.get('floor', ''),
+            'nearby': lead.get('nearby', ''),
+            'agreement': lead.get('agreement', ''),
             'seatsRecursion': seats_recursion,
             'amenityRecursion': amenity_recursion,
             'totalSeatsAmount': total_seats_amount,
@@ -179,16 +261,16 @@ def get_client_details(lead_id):
             'amenitiesCount': len(amenity_recursion),
             'totalBilledItems': len(seats_recursion) + len(amenity_recursion),
             # Basic details
-            'assigned_to': lead_doc.get('assignedto', ''),
-            'managed_by': lead_doc.get('managed_by', ''),
-            'primary_email': lead_doc.get('primary_email', ''),
-            'secondary_email': lead_doc.get('secondary_email', ''),
-            'mobile_phone': lead_doc.get('mobile_phone', ''),
-            'alternative_number': lead_doc.get('alternative_number', ''),
-            'whatsapp_link_1': lead_doc.get('whatsapp_link_1', ''),
-            'whatsapp_link_2': lead_doc.get('whatsapp_link_2', ''),
-            'email': lead_doc.get('primary_email', '') or lead_doc.get('secondary_email', ''),
-            'whatsapp_link': lead_doc.get('whatsapp_link_1', '') or lead_doc.get('whatsapp_link_2', '')
+            'assigned_to': lead.get('assignedto', ''),
+            'managed_by': lead.get('managed_by', ''),
+            'primary_email': lead.get('primary_email', ''),
+            'secondary_email': lead.get('secondary_email', ''),
+            'mobile_phone': lead.get('mobile_phone', ''),
+            'alternative_number': lead.get('alternative_number', ''),
+            'whatsapp_link_1': lead.get('whatsapp_link_1', ''),
+            'whatsapp_link_2': lead.get('whatsapp_link_2', ''),
+            'email': lead.get('primary_email', '') or lead.get('secondary_email', ''),
+            'whatsapp_link': lead.get('whatsapp_link_1', '') or lead.get('whatsapp_link_2', '')
         }
         
         return {
@@ -207,34 +289,14 @@ def get_seats_recursion(lead_id):
     """
     Returns seat (item) child table data for a given lead
     """
-    if not frappe.db.exists('Leads', lead_id):
-        return {'success': False, 'message': 'Lead not found'}
-
     try:
-        lead_doc = frappe.get_doc('Leads', lead_id)
-
-        seat_items = []
-        for item in lead_doc.item:
-            seat_items.append({
-                'name': item.name,  # unique row ID
-                'item_code': item.item_code,
-                'sales_description': item.sales_description,
-                'qty': item.qty,
-                'rate': item.rate,
-                'amount': item.amount,
-                'start_date': item.start_date,
-                'stop_date': item.stop_date,
-                'rollout_status': item.rollout_status,
-                'floor': getattr(item, 'floor', ''),
-                'novel_billing_entity': getattr(item, 'novel_billing_entity', ''),
-                'billing_period': getattr(item, 'billing_period', ''),
-                'deposit_amt': getattr(item, 'deposit_amt', 0),
-                'deposit_months': getattr(item, 'deposit_months', 0)
-            })
+        projection = get_lead_projection([lead_id], tables=(SEATS_TABLE,), shape='raw', header_fields=()).get(lead_id)
+        if not projection:
+            return {'success': False, 'message': 'Lead not found'}
 
         return {
             'success': True,
-            'data': seat_items
+            'data': projection[SEATS_TABLE]
         }
 
     except Exception as e:
@@ -250,69 +312,12 @@ def get_client_attachments(lead_id):
         if not frappe.db.exists('Leads', lead_id):
             return []
         
-        # Get attachments from File doctype
-        attachments = frappe.get_all(
-            "File",
-            filters={
-                "attached_to_doctype": "Leads",
-                "attached_to_name": lead_id
-            },
-            fields=["name", "file_name", "file_url", "is_private", "file_size", "content_hash"]
-        )
-        
-        # Process attachments to include file type and formatted size
-        processed_attachments = []
-        for attachment in attachments:
-            file_name = attachment.get('file_name', '')
-            file_extension = file_name.split('.')[-1].lower() if '.' in file_name else ''
-            
-            # Determine file type based on extension
-            file_type = 'other'
-            if file_extension in ['pdf']:
-                file_type = 'pdf'
-            elif file_extension in ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'svg']:
-                file_type = 'image'
-            elif file_extension in ['doc', 'docx']:
-                file_type = 'document'
-            elif file_extension in ['xls', 'xlsx']:
-                file_type = 'spreadsheet'
-            elif file_extension in ['txt', 'md']:
-                file_type = 'text'
-            
-            # Format file size
-            file_size = attachment.get('file_size', 0)
-            formatted_size = format_file_size(file_size)
-            
-            processed_attachments.append({
-                'id': attachment.get('name'),
-                'file_name': file_name,
-                'file_url': attachment.get('file_url'),
-                'is_private': attachment.get('is_private', False),
-                'file_type': file_type,
-                'file_size': file_size,
-                'formatted_size': formatted_size,
-                'content_hash': attachment.get('content_hash')
-            })
-        
-        return processed_attachments
+        # Processed attachments, cached per lead until one of its Files changes
+        return get_lead_attachments([lead_id])[lead_id]
         
     except Exception as e:
         print(f"Error fetching attachments for lead {lead_id}: {str(e)}")
         return []
 
-def format_file_size(size_bytes):
-    """
-    Format file size in human readable format
-    """
-    if size_bytes == 0:
-        return "0 B"
-    
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    import math
-    i = int(math.floor(math.log(size_bytes, 1024)))
-    p = math.pow(1024, i)
-    s = round(size_bytes / p, 2)
-    return f"{s} {size_names[i]}"
-
 
 
@@ -0,0 +1,115 @@
+import frappe
+
+DETAIL_DOCTYPE = "Space Plan detail"
+
+# Child tables of Space Plan detail holding the PDFs, by role.
+# "latest" rows are only returned when approved; "previous" rows always.
+LATEST_TABLES = ("old", "latest_files")
+PREVIOUS_TABLES = ("new", "previous_files")
+
+# Optional child columns copied into the payload; missing ones read as ''/0
+OPTIONAL_COLUMNS = ("comment", "location", "floor")
+
+_queries = {}
+
+
+def get_pdf_query():
+    """
+    UNION ALL query returning approved "latest" and all "previous" PDF rows for
+    one lead, built from the Space Plan detail meta and cached per site/meta version.
+    Returns None when the schema has no PDF tables.
+    """
+    meta = frappe.get_meta(DETAIL_DOCTYPE)
+    key = (frappe.local.site, str(meta.modified))
+    if key not in _queries:
+        _queries[key] = _build_pdf_query(meta)
+    return _queries[key]
+
+
+def _build_pdf_query(meta):
+    # How a detail row is tied to a lead: its own lead_id, or the parent Space Plan's
+    # (details saved with an empty lead_id still resolve through their parent)
+    if meta.has_field("lead_id"):
+        lead_join = "LEFT JOIN `tabSpace Plan` sp ON sp.name = d.parent"
+        lead_condition = "(d.lead_id = %(lead_id)s OR sp.lead_id = %(lead_id)s)"
+    else:
+        lead_join = "JOIN `tabSpace Plan` sp ON sp.name = d.parent"
+        lead_condition = "sp.lead_id = %(lead_id)s"
+
+    selects = []
+    for position, df in enumerate(meta.get_table_fields()):
+        if df.fieldname in LATEST_TABLES:
+            kind = "latest"
+        elif df.fieldname in PREVIOUS_TABLES:
+            kind = "previous"
+        else:
+            continue
+
+        child_meta = frappe.get_meta(df.options)
+        has_approved = child_meta.has_field("approved")
+        if not child_meta.has_field("attachment") or (kind == "latest" and not has_approved):
+            continue
+
+        columns = [
+            f"IFNULL(c.{column}, '') AS {column}" if child_meta.has_field(column) else f"'' AS {column}"
+            for column in OPTIONAL_COLUMNS
+        ]
+        columns.append("IFNULL(c.approved, 0) AS approved" if has_approved else "0 AS approved")
+
+        conditions = [lead_condition, "IFNULL(c.attachment, '') != ''"]
+        if kind == "latest":
+            conditions.append("c.approved = 1")
+
+        selects.append(f"""
+            SELECT
+                '{kind}' AS kind,
+                c.name,
+                c.attachment,
+                {', '.join(columns)},
+                d.modified AS detail_modified,
+                d.name AS detail_name,
+                {position} AS table_position,
+                c.idx
+            FROM `tab{df.options}` c
+            JOIN `tab{DETAIL_DOCTYPE}` d
+                ON d.name = c.parent
+                AND c.parenttype = '{DETAIL_DOCTYPE}'
+                AND c.parentfield = '{df.fieldname}'
+            {lead_join}
+            WHERE {' AND '.join(conditions)}
+        """)
+
+    if not selects:
+        return None
+
+    return "{0} ORDER BY detail_modified DESC, detail_name, table_position, idx".format(
+        " UNION ALL ".join(selects)
+    )
+
+
+def resolve_space_plan_pdfs(lead_id):
+    """
+    Latest (approved "old") and previous ("new") PDFs for a lead in one query
+    """
+    latest_pdfs = []
+    previous_pdfs = []
+
+    query = get_pdf_query()
+    if not query:
+        return {"latest_pdfs": latest_pdfs, "previous_pdfs": previous_pdfs}
+
+    for row in frappe.db.sql(query, {"lead_id": lead_id}, as_dict=True):
+        pdf = {
+            "name": row.name,
+            "attachment": row.attachment,
+            "comment": row.comment,
+            "location": row.location,
+            "floor": row.floor
+        }
+        if row.kind == "latest":
+            latest_pdfs.append(pdf)
+        else:
+            pdf["approved"] = row.approved
+            previous_pdfs.append(pdf)
+
+    return {"latest_pdfs": latest_pdfs, "previous_pdfs": previous_pdfs}
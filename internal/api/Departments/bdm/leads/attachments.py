@@ -0,0 +1,133 @@
+import json
+
+import frappe
+from internal.api.Common.hash_cache import delete_hash_fields
+
+# Processed File attachments per lead, invalidated by the File doc_events hook
+ATTACHMENTS_CACHE = 'internal_lead_attachments'
+
+FILE_TYPE_EXTENSIONS = {
+    'pdf': ['pdf'],
+    'image': ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'svg'],
+    'document': ['doc', 'docx'],
+    'spreadsheet': ['xls', 'xlsx'],
+    'text': ['txt', 'md']
+}
+# extension -> file type, anything else is 'other'
+FILE_TYPES = {
+    extension: file_type
+    for file_type, extensions in FILE_TYPE_EXTENSIONS.items()
+    for extension in extensions
+}
+SIZE_UNITS = ['B', 'KB', 'MB', 'GB', 'TB']
+
+
+def get_file_type(file_name):
+    extension = file_name.rsplit('.', 1)[-1].lower() if '.' in file_name else ''
+    return FILE_TYPES.get(extension, 'other')
+
+
+def format_file_size(size_bytes):
+    """
+    Format file size in human readable format
+    """
+    size_bytes = int(size_bytes or 0)
+    if size_bytes <= 0:
+        return "0 B"
+    # 1024-based unit from the bit length instead of a float log
+    unit = min((size_bytes.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    return f"{round(size_bytes / (1 << (10 * unit)), 2)} {SIZE_UNITS[unit]}"
+
+
+def _build_attachment(row):
+    file_name = row.file_name or ''
+    return {
+        'id': row.name,
+        'file_name': file_name,
+        'file_url': row.file_url,
+        'is_private': row.is_private,
+        'file_type': get_file_type(file_name),
+        'file_size': row.file_size or 0,
+        'formatted_size': format_file_size(row.file_size),
+        'content_hash': row.content_hash
+    }
+
+
+def _fetch_attachments(lead_ids):
+    attachments = {lead_id: [] for lead_id in lead_ids}
+    rows = frappe.db.sql("""
+        SELECT
+            attached_to_name,
+            name,
+            file_name,
+            file_url,
+            is_private,
+            file_size,
+            content_hash
+        FROM `tabFile`
+        WHERE
+            attached_to_doctype = 'Leads'
+            AND attached_to_name IN %(leads)s
+        ORDER BY modified DESC
+    """, {'leads': tuple(lead_ids)}, as_dict=True)
+    for row in rows:
+        attachments[row.attached_to_name].append(_build_attachment(row))
+    return attachments
+
+
+def get_lead_attachments(lead_ids):
+    """
+    Attachments for many leads, most recently modified first (frappe.get_all's
+    default order, as get_client_attachments used), from the per-lead cache where
+    possible and one grouped File query for the rest.
+
+    Returns:
+        dict: lead id -> [{id, file_name, file_url, is_private, file_type, file_size, formatted_size, content_hash}]
+    """
+    cache = frappe.cache()
+    result = {}
+    missing = []
+    for lead_id in dict.fromkeys(lead_ids):
+        attachments = cache.hget(ATTACHMENTS_CACHE, lead_id)
+        if attachments is None:
+            missing.append(lead_id)
+        else:
+            result[lead_id] = attachments
+
+    if missing:
+        for lead_id, attachments in _fetch_attachments(missing).items():
+            cache.hset(ATTACHMENTS_CACHE, lead_id, attachments)
+            result[lead_id] = attachments
+    return result
+
+
+def invalidate_attachments(lead_ids):
+    delete_hash_fields(ATTACHMENTS_CACHE, lead_ids)
+
+
+def on_file_change(doc, method=None):
+    """doc_events hook for File (on_change / on_trash)"""
+    leads = []
+    if doc.attached_to_doctype == 'Leads':
+        leads.append(doc.attached_to_name)
+    before = doc.get_doc_before_save()
+    if before and before.attached_to_doctype == 'Leads':
+        leads.append(before.attached_to_name)
+    invalidate_attachments(leads)
+
+
+@frappe.whitelist()
+def get_attachments(lead_ids, counts_only=0):
+    """
+    Attachments (or just their counts) for many leads in one call
+    Returns: {success, data: {lead_id: [attachment] | count}}
+    """
+    if isinstance(lead_ids, str):
+        lead_ids = json.loads(lead_ids) if lead_ids.startswith('[') else lead_ids.split(',')
+    attachments = get_lead_attachments(lead_ids or [])
+    if frappe.utils.cint(counts_only):
+        attachments = {lead_id: len(files) for lead_id, files in attachments.items()}
+    return {
+        'success': True,
+        'data': attachments
+    }
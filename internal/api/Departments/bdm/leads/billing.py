@@ -0,0 +1,72 @@
+import frappe
+
+SEATS_TABLE = 'item'
+AMENITIES_TABLE = 'amenity_recursion'
+
+
+def get_child_doctype(fieldname, parent='Leads'):
+    """
+    Child doctype behind a table field of the parent doctype (meta is cached by Frappe)
+    """
+    return frappe.get_meta(parent).get_field(fieldname).options
+
+
+def empty_totals():
+    return {
+        'seats_rows': 0,
+        'seats_qty': 0,
+        'seats_amount': 0,
+        'amenities_rows': 0,
+        'amenities_qty': 0,
+        'amenities_amount': 0
+    }
+
+
+def grouped_totals_sql(fieldname, parents_sql):
+    """
+    SQL for per-lead COUNT/SUM(qty)/SUM(amount) over one child table.
+    `parents_sql` is a placeholder or subquery yielding the lead names to aggregate.
+    """
+    return """
+        SELECT
+            parent,
+            COUNT(*) AS row_count,
+            SUM(qty) AS qty,
+            SUM(amount) AS amount
+        FROM `tab{doctype}`
+        WHERE
+            parenttype = 'Leads'
+            AND parentfield = '{fieldname}'
+            AND parent IN {parents}
+        GROUP BY parent
+    """.format(doctype=get_child_doctype(fieldname), fieldname=fieldname, parents=parents_sql)
+
+
+def get_billing_totals(lead_names):
+    """
+    Seat and amenity row counts, quantities and amounts for many leads.
+
+    Runs one grouped query per child table instead of loading every lead
+    document. Leads without child rows get zeroed totals.
+
+    Returns:
+        dict: lead name -> totals (see empty_totals)
+    """
+    totals = {name: empty_totals() for name in lead_names}
+    if not totals:
+        return totals
+
+    for prefix, fieldname in (('seats', SEATS_TABLE), ('amenities', AMENITIES_TABLE)):
+        rows = frappe.db.sql(
+            grouped_totals_sql(fieldname, '%(parents)s'),
+            {'parents': tuple(totals)},
+            as_dict=True
+        )
+
+        for row in rows:
+            lead_totals = totals[row['parent']]
+            lead_totals[f'{prefix}_rows'] = row['row_count']
+            lead_totals[f'{prefix}_qty'] = row['qty'] or 0
+            lead_totals[f'{prefix}_amount'] = row['amount'] or 0
+
+    return totals
@@ -0,0 +1,63 @@
+import frappe
+from internal.api.Departments.bdm.leads.projection import get_lead_projection
+
+PROJECTION_CACHE = 'internal_lead_projection'
+HIT_COUNTER = 'internal_lead_projection_hits'
+MISS_COUNTER = 'internal_lead_projection_misses'
+
+
+def get_cached_projection(lead_id):
+    """
+    Lead detail projection (header + seat/amenity rows) from redis.
+
+    Entries are stamped with the lead's `modified`, so a stale entry is never
+    served even if an invalidation hook was bypassed. Returns None for unknown leads.
+    """
+    modified = frappe.db.get_value('Leads', lead_id, 'modified')
+    if not modified:
+        return None
+
+    cache = frappe.cache()
+    entry = cache.hget(PROJECTION_CACHE, lead_id)
+    if entry and entry['modified'] == str(modified):
+        cache.incr(cache.make_key(HIT_COUNTER))
+        return entry['projection']
+
+    cache.incr(cache.make_key(MISS_COUNTER))
+    projection = get_lead_projection([lead_id]).get(lead_id)
+    if projection:
+        cache.hset(PROJECTION_CACHE, lead_id, {
+            'modified': str(projection['header']['modified']),
+            'projection': projection
+        })
+    return projection
+
+
+def invalidate_lead(lead_id):
+    frappe.cache().hdel(PROJECTION_CACHE, lead_id)
+
+
+def on_lead_change(doc, method=None):
+    """doc_events hook for Leads (on_change / on_trash)"""
+    invalidate_lead(doc.name)
+
+
+def on_child_change(doc, method=None):
+    """doc_events hook for child rows saved or deleted on their own"""
+    if doc.get('parenttype') == 'Leads' and doc.get('parent'):
+        invalidate_lead(doc.parent)
+
+
+@frappe.whitelist()
+def get_lead_cache_stats():
+    """Hit/miss counters for the lead projection cache"""
+    cache = frappe.cache()
+    hits = int(cache.get(cache.make_key(HIT_COUNTER)) or 0)
+    misses = int(cache.get(cache.make_key(MISS_COUNTER)) or 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / lookups, 4) if lookups else None,
+        'cached_leads': len(cache.hkeys(PROJECTION_CACHE))
+    }
@@ -0,0 +1,151 @@
+import frappe
+from collections import defaultdict
+from internal.api.Departments.bdm.leads.billing import AMENITIES_TABLE, SEATS_TABLE, get_child_doctype
+
+# Leads columns exposed by the client/proposal detail endpoints.
+# Fields missing from the doctype come back as ''.
+LEAD_HEADER_FIELDS = [
+    'name1', 'mobile_phone', 'primary_email', 'secondary_email', 'leasing_status',
+    'company', 'company_name', 'lead_title', 'building', 'floor', 'nearby', 'agreement',
+    'assignedto', 'managed_by', 'alternative_number', 'whatsapp_link_1', 'whatsapp_link_2'
+]
+
+ROW_TYPES = {
+    SEATS_TABLE: 'Seat',
+    AMENITIES_TABLE: 'Amenity'
+}
+
+# Row shapes as (output key, child column, default, coalesce).
+# coalesce=True mirrors `value or default`; otherwise the default only applies
+# when the column does not exist on the child doctype.
+ROW_SHAPES = {
+    # client drawer / proposal detail rows
+    'detail': [
+        ('id', 'name', None, False),
+        ('option', 'item_code', '', True),
+        ('quantity', 'qty', 0, True),
+        ('note', 'sales_description', '', True),
+        ('rate', 'rate', 0, True),
+        ('amount', 'amount', 0, True),
+        ('start_date', 'start_date', None, False),
+        ('stop_date', 'stop_date', None, False),
+        ('rollout_status', 'rollout_status', None, False),
+        ('floor', 'floor', '', False),
+        ('novel_billing_entity', 'novel_billing_entity', '', False),
+        ('billing_period', 'billing_period', '', False),
+        ('deposit_amt', 'deposit_amt', 0, False),
+        ('deposit_months', 'deposit_months', 0, False)
+    ],
+    # raw child rows keyed by column name (get_seats_recursion)
+    'raw': [
+        ('name', 'name', None, False),
+        ('item_code', 'item_code', None, False),
+        ('sales_description', 'sales_description', None, False),
+        ('qty', 'qty', None, False),
+        ('rate', 'rate', None, False),
+        ('amount', 'amount', None, False),
+        ('start_date', 'start_date', None, False),
+        ('stop_date', 'stop_date', None, False),
+        ('rollout_status', 'rollout_status', None, False),
+        ('floor', 'floor', '', False),
+        ('novel_billing_entity', 'novel_billing_entity', '', False),
+        ('billing_period', 'billing_period', '', False),
+        ('deposit_amt', 'deposit_amt', 0, False),
+        ('deposit_months', 'deposit_months', 0, False)
+    ]
+}
+
+_compiled = {}
+
+
+def _compile(doctype, spec):
+    """
+    Resolve a field spec against the doctype meta once: the columns to select
+    and, per output key, either the column to read or a constant default.
+    """
+    meta = frappe.get_meta(doctype)
+    key = (frappe.local.site, doctype, tuple(spec), str(meta.modified))
+    if key not in _compiled:
+        plan = []
+        for out_key, column, default, coalesce in spec:
+            present = column == 'name' or meta.has_field(column)
+            plan.append((out_key, column if present else None, default, coalesce))
+        columns = sorted({column for _, column, _, _ in plan if column})
+        _compiled[key] = (columns, plan)
+    return _compiled[key]
+
+
+def _build_row(row, plan, extra=None):
+    data = dict(extra) if extra else {}
+    for out_key, column, default, coalesce in plan:
+        if column is None:
+            data[out_key] = default
+        elif coalesce:
+            data[out_key] = row[column] or default
+        else:
+            data[out_key] = row[column]
+    return data
+
+
+def get_lead_headers(lead_ids, fields=LEAD_HEADER_FIELDS):
+    """
+    Requested Leads columns (plus name and modified) for many leads in one query
+    """
+    if not lead_ids:
+        return {}
+    columns, plan = _compile('Leads', [(f, f, '', False) for f in fields])
+    rows = frappe.get_all(
+        'Leads',
+        filters={'name': ['in', list(lead_ids)]},
+        fields=sorted(set(columns) | {'name', 'modified'})
+    )
+    return {row['name']: _build_row(row, plan, {'name': row['name'], 'modified': row['modified']}) for row in rows}
+
+
+def get_child_rows(lead_ids, tables=(SEATS_TABLE, AMENITIES_TABLE), shape='detail'):
+    """
+    Child table rows for many leads, shaped by ROW_SHAPES[shape].
+    One frappe.get_all per child doctype, selecting only the mapped columns.
+
+    Returns:
+        dict: lead id -> {table fieldname -> [rows]} (every lead id and table present)
+    """
+    result = {lead_id: {table: [] for table in tables} for lead_id in lead_ids}
+    if not result:
+        return result
+
+    tables_by_doctype = defaultdict(list)
+    for table in tables:
+        tables_by_doctype[get_child_doctype(table)].append(table)
+
+    for doctype, doctype_tables in tables_by_doctype.items():
+        columns, plan = _compile(doctype, ROW_SHAPES[shape])
+        rows = frappe.get_all(
+            doctype,
+            filters={
+                'parenttype': 'Leads',
+                'parentfield': ['in', doctype_tables],
+                'parent': ['in', list(result)]
+            },
+            fields=sorted(set(columns) | {'parent', 'parentfield'}),
+            order_by='idx asc',
+            parent_doctype='Leads'
+        )
+        for row in rows:
+            extra = {'type': ROW_TYPES[row['parentfield']]} if shape == 'detail' else None
+            result[row['parent']][row['parentfield']].append(_build_row(row, plan, extra))
+
+    return result
+
+
+def get_lead_projection(lead_ids, tables=(SEATS_TABLE, AMENITIES_TABLE), shape='detail', header_fields=LEAD_HEADER_FIELDS):
+    """
+    Header columns and child rows for the given leads, without loading Leads documents.
+    Unknown lead ids are left out of the result.
+
+    Returns:
+        dict: lead id -> {'header': {...}, <table fieldname>: [rows], ...}
+    """
+    headers = get_lead_headers(lead_ids, header_fields)
+    children = get_child_rows(list(headers), tables, shape)
+    return {lead_id: dict(children[lead_id], header=header) for lead_id, header in headers.items()}
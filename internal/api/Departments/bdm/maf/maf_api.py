@@ -1,66 +1,155 @@
 # NOTE: The following uses Frappe APIs. Linter may not recognize 'frappe.whitelist', 'frappe.form_dict', 'frappe.get_all', or 'frappe.db', but these are valid in Frappe framework.
 
 import frappe
+import json
+from internal.api.Common.hash_cache import delete_hash_fields
 from internal.api.Departments.bdm.visiting_leads import get_leads_by_id
 
+# Column projections for MAF Document reads
+MAF_FULL_FIELDS = [
+    "name",
+    "owner",
+    "creation",
+    "modified",
+    "modified_by",
+    "docstatus",
+    "idx",
+    "link_in",
+    "update1",
+    "maf_client_id",
+    "form_url",
+    "type_of_customer",
+    "customer_email",
+    "agreement_entered",
+    "place",
+    "company2",
+    "rate1",
+    "company_address",
+    "customer",
+    "location",
+    "authorized_name",
+    "cr_email",
+    "subject",
+    "rollout",
+    "rental_es",
+    "maf_send_mail",
+    "term_of_maf",
+    "term_commencement_date",
+    "term_end_date",
+    "handover_date",
+    "security_deposit",
+    "lockinperiod",
+    "noticeperiod",
+    "mr",
+    "cr",
+    "mr_or_cr",
+    "bdm_email",
+    "email_sent",
+    "update_clause"
+]
+# enough for a status badge on the clients list
+MAF_SUMMARY_FIELDS = [
+    "name",
+    "link_in",
+    "docstatus",
+    "modified",
+    "maf_client_id",
+    "customer",
+    "email_sent",
+    "term_commencement_date",
+    "term_end_date"
+]
+MAF_PROJECTIONS = {
+    "summary": MAF_SUMMARY_FIELDS,
+    "full": MAF_FULL_FIELDS
+}
+
+# lead_name -> Leads id ("" when no lead has that name); entries are dropped when a
+# lead with that name changes
+LEAD_NAME_CACHE = "internal_lead_name_to_id"
+
+
+def _maf_columns(projection):
+    if projection not in MAF_PROJECTIONS:
+        frappe.throw(f"Unsupported projection: {projection}")
+    return ",\n            ".join(MAF_PROJECTIONS[projection])
+
+
+def resolve_lead_id(lead_id_or_name):
+    """Lead id for a lead id or lead name, or None"""
+    if lead_id_or_name.startswith('LEAD'):
+        return lead_id_or_name
+
+    cache = frappe.cache()
+    lead_id = cache.hget(LEAD_NAME_CACHE, lead_id_or_name)
+    if lead_id is None:
+        lead_id = frappe.db.get_value('Leads', {'lead_name': lead_id_or_name}, 'name') or ""
+        cache.hset(LEAD_NAME_CACHE, lead_id_or_name, lead_id)
+    return lead_id or None
+
+
+def invalidate_lead_name(doc, method=None):
+    """doc_events hook for Leads (on_change / on_trash): drop old and new lead_name entries"""
+    names = [doc.get('lead_name')]
+    before = doc.get_doc_before_save()
+    if before:
+        names.append(before.get('lead_name'))
+    delete_hash_fields(LEAD_NAME_CACHE, names)
+
+
+def get_mafs_for_leads(lead_ids, projection="summary"):
+    """
+    MAF Document per lead id in one query (latest modified wins).
+
+    Returns:
+        dict: lead id -> MAF row, or None for leads without a MAF
+    """
+    mafs = {lead_id: None for lead_id in lead_ids}
+    if not mafs:
+        return mafs
+    rows = frappe.db.sql(f"""
+        SELECT
+            {_maf_columns(projection)}
+        FROM `tabMAF Document`
+        WHERE link_in IN %s
+        ORDER BY modified DESC
+    """, (tuple(mafs),), as_dict=True)
+    for row in rows:
+        if mafs[row.link_in] is None:
+            mafs[row.link_in] = row
+    return mafs
+
+
 @frappe.whitelist(allow_guest=True)
-def get_mafID(lead_id_or_name=None):
+def get_mafID(lead_id_or_name=None, projection="full"):
     if not lead_id_or_name:
         lead_id_or_name = frappe.form_dict.get('lead_id_or_name')
     if not lead_id_or_name:
         return {}
 
-    # If not a lead id, resolve from Leads doctype
-    if not lead_id_or_name.startswith('LEAD'):
-        # Try to fetch the lead id by name from Leads doctype
-        lead_data = frappe.get_all('Leads', filters={'lead_name': lead_id_or_name}, fields=['name'], limit=1)
-        if lead_data:
-            lead_id_or_name = lead_data[0]['name']
-        else:
-            return {}
-    result = frappe.db.sql("""
+    # If not a lead id, resolve from Leads doctype (cached)
+    lead_id = resolve_lead_id(lead_id_or_name)
+    if not lead_id:
+        return {}
+    result = frappe.db.sql(f"""
         SELECT
-            name,
-            owner,
-            creation,
-            modified,
-            modified_by,
-            docstatus,
-            idx,
-            link_in,
-            update1,
-            maf_client_id,
-            form_url,
-            type_of_customer,
-            customer_email,
-            agreement_entered,
-            place,
-            company2,
-            rate1,
-            company_address,
-            customer,
-            location,
-            authorized_name,
-            cr_email,
-            subject,
-            rollout,
-            rental_es,
-            maf_send_mail,
-            term_of_maf,
-            term_commencement_date,
-            term_end_date,
-            handover_date,
-            security_deposit,
-            lockinperiod,
-            noticeperiod,
-            mr,
-            cr,
-            mr_or_cr,
-            bdm_email,
-            email_sent,
-            update_clause
+            {_maf_columns(projection)}
         FROM `tabMAF Document`
         WHERE link_in = %s
         LIMIT 1
-    """, (lead_id_or_name,), as_dict=True)
-    return result[0] if result else {}
\ No newline at end of file
+    """, (lead_id,), as_dict=True)
+    return result[0] if result else {}
+
+
+@frappe.whitelist()
+def get_mafs(lead_ids=None, projection="summary"):
+    """
+    MAF status for many leads (clients list badges)
+    Returns: {success, data: {lead_id: MAF row | None}}
+    """
+    if isinstance(lead_ids, str):
+        lead_ids = json.loads(lead_ids) if lead_ids.startswith('[') else lead_ids.split(',')
+    return {
+        'success': True,
+        'data': get_mafs_for_leads(list(dict.fromkeys(lead_ids or [])), projection)
+    }
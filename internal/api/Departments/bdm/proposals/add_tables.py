@@ -1,7 +1,21 @@
 import frappe
+import csv
+import io
 import json
-from frappe.utils import now_datetime
+from frappe.utils import cint, flt, now_datetime
 from frappe import _
+from werkzeug.wrappers import Response
+from internal.api.Departments.bdm.leads.billing import AMENITIES_TABLE, SEATS_TABLE, get_billing_totals
+from internal.api.Departments.bdm.leads.cache import get_cached_projection
+from internal.api.Departments.bdm.leads.projection import get_lead_headers
+from internal.api.Departments.bdm.proposals.lead_export import (
+    EXPORT_FORMATS,
+    get_export_lead_names,
+    gzip_chunks,
+    iter_export_chunks,
+    iter_export_rows,
+    stream_with_db
+)
 
 @frappe.whitelist()
 def get_details(lead_id="LEADID00286951"):
@@ -9,64 +23,22 @@ def get_details(lead_id="LEADID00286951"):
     Fetch detailed information for a specific client by lead ID
     """
     try:
-        # Check if lead exists
-        if not frappe.db.exists('Leads', lead_id):
+        # Lead header columns and child rows, served from cache while the lead is unchanged
+        projection = get_cached_projection(lead_id)
+        if not projection:
             return {
                 'success': False,
                 'message': f'Lead {lead_id} not found'
             }
         
-        # Get the lead document
-        lead_doc = frappe.get_doc('Leads', lead_id)
+        lead = projection['header']
+        seats_recursion = projection[SEATS_TABLE]
+        amenity_recursion = projection[AMENITIES_TABLE]
         
         # Basic client info
-        name = lead_doc.get('name1') or ''
+        name = lead.get('name1') or ''
         initials = ''.join([part[0].upper() for part in name.split() if part])[:2]
-        contact = lead_doc.get('mobile_phone') or lead_doc.get('primary_email') or ''
-        
-        # Get seats recursion (item table) with full details
-        seats_recursion = []
-        if hasattr(lead_doc, 'item') and lead_doc.item:
-            for item in lead_doc.item:
-                seats_recursion.append({
-                    'id': item.name,
-                    'type': 'Seat',
-                    'option': item.item_code or '',
-                    'quantity': item.qty or 0,
-                    'note': item.sales_description or '',
-                    'rate': item.rate or 0,
-                    'amount': item.amount or 0,
-                    'start_date': item.start_date,
-                    'stop_date': item.stop_date,
-                    'rollout_status': item.rollout_status,
-                    'floor': getattr(item, 'floor', ''),
-                    'novel_billing_entity': getattr(item, 'novel_billing_entity', ''),
-                    'billing_period': getattr(item, 'billing_period', ''),
-                    'deposit_amt': getattr(item, 'deposit_amt', 0),
-                    'deposit_months': getattr(item, 'deposit_months', 0)
-                })
-        
-        # Get amenity recursion with full details
-        amenity_recursion = []
-        if hasattr(lead_doc, 'amenity_recursion') and lead_doc.amenity_recursion:
-            for amenity in lead_doc.amenity_recursion:
-                amenity_recursion.append({
-                    'id': amenity.name,
-                    'type': 'Amenity',
-                    'option': amenity.item_code or '',
-                    'quantity': amenity.qty or 0,
-                    'note': amenity.sales_description or '',
-                    'rate': amenity.rate or 0,
-                    'amount': amenity.amount or 0,
-                    'start_date': amenity.start_date,
-                    'stop_date': amenity.stop_date,
-                    'rollout_status': amenity.rollout_status,
-                    'floor': getattr(amenity, 'floor', ''),
-                    'novel_billing_entity': getattr(amenity, 'novel_billing_entity', ''),
-                    'billing_period': getattr(amenity, 'billing_period', ''),
-                    'deposit_amt': getattr(amenity, 'deposit_amt', 0),
-                    'deposit_months': getattr(amenity, 'deposit_months', 0)
-                })
+        contact = lead.get('mobile_phone') or lead.get('primary_email') or ''
         
         # Calculate totals
         total_seats_amount = sum(item['amount'] for item in seats_recursion)
@@ -79,13 +51,13 @@ def get_details(lead_id="LEADID00286951"):
             'leadId': lead_id,
             'name': name,
             'contact': contact,
-            'status': lead_doc.get('leasing_status', ''),
+            'status': lead.get('leasing_status', ''),
             'initials': initials,
-            'company_name': lead_doc.get('company_name', ''),
-            'lead_title': lead_doc.get('lead_title', ''),
-            'building': lead_doc.get('building', ''),
-            'floor': lead_doc.get('floor', ''),
-            'nearby': lead_doc.get('nearby', ''),
+            'company_name': lead.get('company_name', ''),
+            'lead_title': lead.get('lead_title', ''),
+            'building': lead.get('building', ''),
+            'floor': lead.get('floor', ''),
+            'nearby': lead.get('nearby', ''),
             'agreement': '',
             'seatsRecursion': seats_recursion,
             'amenityRecursion': amenity_recursion,
@@ -141,6 +113,83 @@ def get_lead_summary(lead_id="LEADID00286951"):
         frappe.throw(_("Failed to fetch lead summary: {0}").format(str(e)))
 
 
+# Columns of the get_lead_summaries payload, in order (same meaning as get_lead_summary)
+SUMMARY_COLUMNS = [
+    'lead_id', 'lead_title', 'total_items', 'seats_count', 'amenities_count',
+    'total_amount', 'seats_total', 'amenities_total'
+]
+
+
+@frappe.whitelist()
+def get_lead_summaries(lead_ids=None, assignedto=None, leasing_status=None, building=None):
+    """
+    get_lead_summary for many leads at once, from grouped child-table SQL.
+
+    Leads are either `lead_ids` or everything matching the filters (lists allowed,
+    e.g. a TL's whole team in `assignedto`).
+
+    Returns:
+        dict: {success, columns, data: {column: [values...]}, totals, count}
+        where every list in `data` is parallel to data['lead_id'].
+    """
+    try:
+        lead_ids, assignedto, leasing_status, building = (
+            json.loads(value) if isinstance(value, str) and value.startswith('[') else value
+            for value in (lead_ids, assignedto, leasing_status, building)
+        )
+        if isinstance(lead_ids, str):
+            lead_ids = [lead_ids]
+        if not (lead_ids or assignedto or leasing_status or building):
+            return {
+                'success': False,
+                'message': 'Pass lead_ids or at least one filter'
+            }
+
+        lead_names = get_export_lead_names(
+            lead_ids=lead_ids,
+            assignedto=assignedto,
+            leasing_status=leasing_status,
+            building=building
+        )
+        # same meta-aware header read as get_details ('' when the column is missing)
+        headers = get_lead_headers(lead_names, ['lead_title'])
+        billing = get_billing_totals(lead_names)
+
+        data = {column: [] for column in SUMMARY_COLUMNS}
+        totals = {column: 0 for column in SUMMARY_COLUMNS[2:]}
+        for lead_id in lead_names:
+            lead_totals = billing[lead_id]
+            row = {
+                'lead_id': lead_id,
+                'lead_title': headers[lead_id]['lead_title'],
+                'total_items': lead_totals['seats_rows'] + lead_totals['amenities_rows'],
+                'seats_count': lead_totals['seats_rows'],
+                'amenities_count': lead_totals['amenities_rows'],
+                'total_amount': flt(lead_totals['seats_amount']) + flt(lead_totals['amenities_amount']),
+                'seats_total': flt(lead_totals['seats_amount']),
+                'amenities_total': flt(lead_totals['amenities_amount'])
+            }
+            for column in SUMMARY_COLUMNS:
+                data[column].append(row[column])
+            for column in totals:
+                totals[column] += row[column]
+
+        return {
+            'success': True,
+            'columns': SUMMARY_COLUMNS,
+            'data': data,
+            'totals': totals,
+            'count': len(lead_names)
+        }
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Lead Summaries API Error")
+        return {
+            'success': False,
+            'message': f'Error fetching lead summaries: {str(e)}'
+        }
+
+
 @frappe.whitelist(allow_guest=True)
 def add_tables(lead_id):
     """
@@ -275,10 +324,9 @@ def create_download_file(lead_id, format_type='json'):
         elif format_type == 'csv':
             filename += '.csv'
             # Convert CSV array to string
-            csv_content = []
-            for row in data:
-                csv_content.append(','.join([f'"{str(cell)}"' for cell in row]))
-            file_content = '\n'.join(csv_content)
+            csv_content = io.StringIO()
+            csv.writer(csv_content, quoting=csv.QUOTE_ALL, lineterminator='\n').writerows(data)
+            file_content = csv_content.getvalue().rstrip('\n')
         else:
             filename += '.txt'
             file_content = json.dumps(data, indent=2, default=str)
@@ -297,3 +345,49 @@ def create_download_file(lead_id, format_type='json'):
             'success': False,
             'message': f'Error creating download file: {str(e)}'
         }
+
+
+@frappe.whitelist()
+def stream_lead_export(format_type='csv', lead_ids=None, assignedto=None, leasing_status=None,
+                       building=None, from_date=None, to_date=None, compress=0):
+    """
+    Stream seat/amenity lines for many leads as CSV or NDJSON.
+
+    Leads are loaded in batches while the response is written, so memory stays
+    bounded regardless of how many leads match.
+
+    Args:
+        format_type (str): 'csv' or 'ndjson'
+        lead_ids (list | str): explicit lead ids (JSON list accepted)
+        assignedto / leasing_status / building: Leads filters
+        from_date / to_date: inclusive range on lead creation date
+        compress (int): 1 to gzip the stream (.gz download)
+    """
+    if format_type not in EXPORT_FORMATS:
+        frappe.throw(_('Unsupported format: {0}').format(format_type))
+    if isinstance(lead_ids, str):
+        lead_ids = json.loads(lead_ids)
+
+    lead_names = get_export_lead_names(
+        lead_ids=lead_ids,
+        from_date=from_date,
+        to_date=to_date,
+        assignedto=assignedto,
+        leasing_status=leasing_status,
+        building=building
+    )
+
+    extension, mimetype = EXPORT_FORMATS[format_type]
+    filename = f"leads_{now_datetime().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+    def make_chunks():
+        chunks = iter_export_chunks(iter_export_rows(lead_names), format_type)
+        return gzip_chunks(chunks) if cint(compress) else chunks
+
+    if cint(compress):
+        filename += '.gz'
+        mimetype = 'application/gzip'
+
+    response = Response(stream_with_db(make_chunks), mimetype=mimetype, direct_passthrough=True)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
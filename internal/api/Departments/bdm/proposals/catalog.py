@@ -0,0 +1,62 @@
+import hashlib
+
+import frappe
+from werkzeug.wrappers import Response
+from internal.api.Common.versioned_cache import get_versioned_value, invalidate_versioned_value
+
+# Seat and amenity catalog for the proposal form, as one snapshot (see
+# Common.versioned_cache). Its version is a hash of the content, so it doubles as
+# the ETag and stays stable across rebuilds.
+CATALOG_DOCTYPES = {
+    "seats": "Leads Items for number of seats",
+    "amenities": "Leads item for Amenities"
+}
+# First of these fields present on a catalog doctype is served as its rate
+CATALOG_RATE_FIELDS = ("rate", "price", "standard_rate")
+
+CATALOG_KEY = "internal_proposal_catalog"
+
+
+def _catalog_fields(doctype):
+    meta = frappe.get_meta(doctype)
+    rate_field = next((field for field in CATALOG_RATE_FIELDS if meta.has_field(field)), None)
+    return ["name", f"{rate_field} as rate"] if rate_field else ["name"]
+
+
+def _build_catalog():
+    catalog = {
+        key: frappe.get_all(doctype, fields=_catalog_fields(doctype), order_by="name asc")
+        for key, doctype in CATALOG_DOCTYPES.items()
+    }
+    catalog["version"] = hashlib.md5(frappe.as_json(catalog).encode()).hexdigest()
+    return catalog
+
+
+def get_catalog():
+    """Snapshot {version, seats: [{name, rate?}], amenities: [{name, rate?}]}"""
+    return get_versioned_value(CATALOG_KEY, _build_catalog, version_of=lambda catalog: catalog["version"])
+
+
+def invalidate_catalog(doc=None, method=None, *args):
+    """doc_events hook for the catalog doctypes (on_change / on_trash / after_rename)"""
+    invalidate_versioned_value(CATALOG_KEY)
+
+
+def conditional_response(message, version):
+    """
+    JSON response shaped like a normal whitelisted return ({"message": ...}),
+    or an empty 304 when the client's If-None-Match already has this version.
+    """
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = frappe.get_request_header("If-None-Match") or ""
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status=304, headers=headers)
+    return Response(frappe.as_json({"message": message}), mimetype="application/json", headers=headers)
+
+
+@frappe.whitelist()
+def get_catalog_api():
+    """Seats and amenities in one call, with ETag / If-None-Match support"""
+    catalog = get_catalog()
+    return conditional_response({"status": "success", "message": catalog}, catalog["version"])
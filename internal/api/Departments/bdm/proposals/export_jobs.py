@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+
+import frappe
+from frappe import _
+from frappe.utils import cint, now_datetime, time_diff_in_seconds
+from internal.api.Departments.bdm.proposals.lead_export import (
+    EXPORT_FORMATS,
+    export_rows_for_batch,
+    get_export_conditions,
+    get_export_lead_batch,
+    iter_export_chunks
+)
+
+# Job state lives in redis so any worker can pick up a resumed job. It holds the
+# filter spec and a keyset cursor ([creation, name] of the last exported lead), not
+# the lead list; `created_before` pins the job to the leads that existed at start.
+# Output is appended to a part file per finished batch; `bytes_written` marks the
+# end of the last finished batch, so a resumed job truncates to it and carries on.
+# The finished part file is moved into private/files and registered as a File
+# without reading it back into memory.
+# Every save stamps `updated_on`; a Queued/Running job whose stamp is older than
+# EXPORT_JOB_STALE_SECONDS lost its worker (OOM, deploy, restart) and can be resumed.
+EXPORT_JOB_KEY = "internal_lead_export_job:{0}"
+EXPORT_JOB_TTL = 7 * 24 * 60 * 60
+EXPORT_JOB_STALE_SECONDS = 15 * 60
+EXPORT_JOB_BATCH_SIZE = 500
+EXPORT_PROGRESS_EVENT = "lead_export_progress"
+
+
+def _job_key(job_id):
+    return EXPORT_JOB_KEY.format(job_id)
+
+
+def get_job(job_id):
+    return frappe.cache().get_value(_job_key(job_id))
+
+
+def save_job(job):
+    job["updated_on"] = str(now_datetime())
+    frappe.cache().set_value(_job_key(job["job_id"]), job, expires_in_sec=EXPORT_JOB_TTL)
+
+
+def _part_path(job_id):
+    folder = frappe.get_site_path("private", "lead_exports")
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f"{job_id}.part")
+
+
+def _publish(job):
+    frappe.publish_realtime(EXPORT_PROGRESS_EVENT, {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "batches_done": job["batches_done"],
+        "total_batches": job["total_batches"],
+        "file_url": job.get("file_url"),
+        "error": job.get("error")
+    }, user=job["user"])
+
+
+def _enqueue(job):
+    frappe.enqueue(
+        "internal.api.Departments.bdm.proposals.export_jobs.run_export_job",
+        queue="long",
+        timeout=3600,
+        job_id=job["job_id"]
+    )
+
+
+def is_stale(job):
+    """Queued/Running job that has not saved progress within EXPORT_JOB_STALE_SECONDS"""
+    return job["status"] in ("Queued", "Running") and (
+        time_diff_in_seconds(now_datetime(), job["updated_on"]) > EXPORT_JOB_STALE_SECONDS
+    )
+
+
+def _get_own_job(job_id):
+    job = get_job(job_id)
+    if not job or job["user"] != frappe.session.user:
+        frappe.throw(_("Export job {0} not found").format(job_id), frappe.DoesNotExistError)
+    return job
+
+
+@frappe.whitelist()
+def start_lead_export_job(format_type="csv", lead_ids=None, assignedto=None, leasing_status=None,
+                          building=None, from_date=None, to_date=None, batch_size=EXPORT_JOB_BATCH_SIZE):
+    """
+    Queue an export of seat/amenity lines for every lead matching the filters.
+    Progress is pushed to the requesting user as `lead_export_progress`; the finished
+    export is a private File attached to their User record.
+
+    Returns: {success, job_id, total_leads, total_batches}
+    """
+    if format_type not in EXPORT_FORMATS:
+        frappe.throw(_("Unsupported format: {0}").format(format_type))
+    if isinstance(lead_ids, str):
+        lead_ids = json.loads(lead_ids)
+
+    spec = {
+        "lead_ids": lead_ids,
+        "from_date": from_date,
+        "to_date": to_date,
+        "created_before": str(now_datetime()),
+        "assignedto": assignedto,
+        "leasing_status": leasing_status,
+        "building": building
+    }
+    total_leads = frappe.db.count("Leads", filters=get_export_conditions(**spec))
+    batch_size = max(1, cint(batch_size))
+
+    job = {
+        "job_id": frappe.generate_hash(length=12),
+        "user": frappe.session.user,
+        "format_type": format_type,
+        "spec": spec,
+        "cursor": None,
+        "batch_size": batch_size,
+        "total_leads": total_leads,
+        "total_batches": (total_leads + batch_size - 1) // batch_size,
+        "batches_done": 0,
+        "bytes_written": 0,
+        "status": "Queued",
+        "file_url": None,
+        "error": None,
+        "created_on": str(now_datetime())
+    }
+    save_job(job)
+    _enqueue(job)
+
+    return {
+        "success": True,
+        "job_id": job["job_id"],
+        "total_leads": total_leads,
+        "total_batches": job["total_batches"]
+    }
+
+
+@frappe.whitelist()
+def get_lead_export_job(job_id):
+    """Current state of one of the user's export jobs (without the filter spec)"""
+    job = _get_own_job(job_id)
+    return {
+        "success": True,
+        "data": {key: value for key, value in job.items() if key != "spec"}
+    }
+
+
+@frappe.whitelist()
+def resume_lead_export_job(job_id):
+    """
+    Re-queue a failed export job, or one whose worker died (stale Queued/Running);
+    it continues after the last finished batch
+    """
+    job = _get_own_job(job_id)
+    if job["status"] != "Failed" and not is_stale(job):
+        frappe.throw(_("Only failed or stalled export jobs can be resumed (job is {0})").format(job["status"]))
+
+    job["status"] = "Queued"
+    job["error"] = None
+    save_job(job)
+    _enqueue(job)
+    return {"success": True, "job_id": job_id, "batches_done": job["batches_done"]}
+
+
+def run_export_job(job_id):
+    """Background worker: write the remaining batches, then store the File"""
+    job = get_job(job_id)
+    if not job or job["status"] == "Completed" or (job["status"] == "Running" and not is_stale(job)):
+        return
+
+    job["status"] = "Running"
+    save_job(job)
+    _publish(job)
+
+    path = _part_path(job_id)
+    try:
+        with open(path, "ab") as part:
+            # drop anything written by a batch that did not finish
+            part.truncate(job["bytes_written"])
+            part.seek(job["bytes_written"])
+
+            while True:
+                batch = get_export_lead_batch(job["spec"], job["cursor"], job["batch_size"])
+                if not batch:
+                    break
+                for chunk in iter_export_chunks(
+                    export_rows_for_batch([lead.name for lead in batch]),
+                    job["format_type"],
+                    include_header=not job["cursor"]
+                ):
+                    part.write(chunk)
+                part.flush()
+
+                job["cursor"] = [str(batch[-1].creation), batch[-1].name]
+                job["batches_done"] += 1
+                job["bytes_written"] = part.tell()
+                save_job(job)
+                _publish(job)
+
+        # leads deleted since the job started shrink the last batches
+        job["total_batches"] = job["batches_done"]
+        job["file_url"] = _store_export_file(job, path)
+        job["status"] = "Completed"
+    except Exception as e:
+        frappe.db.rollback()
+        job["status"] = "Failed"
+        job["error"] = str(e)
+        frappe.log_error(frappe.get_traceback(), f"Lead export job {job_id} failed")
+    finally:
+        save_job(job)
+        _publish(job)
+
+
+def _file_digest(path):
+    """(size, md5 content hash) of a file, read in chunks"""
+    digest = hashlib.md5()
+    with open(path, "rb") as part:
+        for chunk in iter(lambda: part.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return os.path.getsize(path), digest.hexdigest()
+
+
+def _store_export_file(job, path):
+    """
+    Move the part file into private/files and insert its File row directly, since
+    File.insert would read the whole export back into memory to hash and save it
+    """
+    extension = EXPORT_FORMATS[job["format_type"]][0]
+    file_name = f"leads_export_{job['job_id']}.{extension}"
+    file_url = f"/private/files/{file_name}"
+    file_size, content_hash = _file_digest(path)
+    timestamp = now_datetime()
+
+    frappe.db.bulk_insert("File", [
+        "name", "owner", "creation", "modified", "modified_by", "file_name", "file_url",
+        "file_size", "content_hash", "is_private", "is_folder", "folder",
+        "attached_to_doctype", "attached_to_name"
+    ], [[
+        frappe.generate_hash(length=10), job["user"], timestamp, timestamp, job["user"], file_name, file_url,
+        file_size, content_hash, 1, 0, "Home/Attachments", "User", job["user"]
+    ]])
+    os.replace(path, frappe.get_site_path("private", "files", file_name))
+    frappe.db.commit()
+    return file_url
@@ -0,0 +1,173 @@
+import csv
+import io
+import json
+import zlib
+
+import frappe
+from frappe.utils import add_days, getdate
+from internal.api.Departments.bdm.leads.billing import AMENITIES_TABLE, SEATS_TABLE
+from internal.api.Departments.bdm.leads.projection import get_lead_projection
+
+EXPORT_FORMATS = {
+    # format -> (file extension, mimetype)
+    'csv': ('csv', 'text/csv'),
+    'ndjson': ('ndjson', 'application/x-ndjson')
+}
+
+# (column header, row key) for one exported seat/amenity line
+EXPORT_COLUMNS = [
+    ('Lead ID', 'lead_id'),
+    ('Lead Name', 'lead_name'),
+    ('Type', 'type'),
+    ('Item Code', 'option'),
+    ('Quantity', 'quantity'),
+    ('Rate', 'rate'),
+    ('Amount', 'amount'),
+    ('Start Date', 'start_date'),
+    ('Stop Date', 'stop_date'),
+    ('Floor', 'floor'),
+    ('Billing Period', 'billing_period')
+]
+
+# Filters accepted by get_export_lead_names, mapped to Leads columns
+EXPORT_FILTER_FIELDS = {
+    'assignedto': 'assignedto',
+    'leasing_status': 'leasing_status',
+    'building': 'building'
+}
+
+DEFAULT_BATCH_SIZE = 200
+CHUNK_SIZE = 64 * 1024
+
+
+def get_export_conditions(lead_ids=None, from_date=None, to_date=None, created_before=None, **filters):
+    """
+    Leads filter list for an export filter spec.
+
+    Args:
+        lead_ids (list): explicit leads; combined with the other filters
+        from_date / to_date: inclusive range on Leads.creation
+        created_before: upper bound on Leads.creation, to pin a job to the leads that existed when it started
+        assignedto / leasing_status / building: equality filters (lists mean "in")
+    """
+    conditions = []
+    for key, value in filters.items():
+        if key not in EXPORT_FILTER_FIELDS:
+            frappe.throw(f'Unsupported export filter: {key}')
+        if value:
+            conditions.append([EXPORT_FILTER_FIELDS[key], 'in' if isinstance(value, list) else '=', value])
+    if lead_ids:
+        conditions.append(['name', 'in', list(lead_ids)])
+    if from_date:
+        conditions.append(['creation', '>=', getdate(from_date)])
+    if to_date:
+        conditions.append(['creation', '<', add_days(getdate(to_date), 1)])
+    if created_before:
+        conditions.append(['creation', '<=', created_before])
+    return conditions
+
+
+def get_export_lead_names(lead_ids=None, from_date=None, to_date=None, **filters):
+    """Lead names matching an export filter spec (see get_export_conditions), oldest first"""
+    return frappe.get_all(
+        'Leads',
+        filters=get_export_conditions(lead_ids, from_date, to_date, **filters),
+        order_by='creation asc, name asc',
+        pluck='name'
+    )
+
+
+def get_export_lead_batch(spec, after=None, limit=DEFAULT_BATCH_SIZE):
+    """
+    Next `limit` leads of an export filter spec in get_export_lead_names order,
+    after the keyset `after` = [creation, name] of the previous batch's last lead.
+
+    Returns:
+        list: [{name, creation}]
+    """
+    conditions = get_export_conditions(**spec)
+    or_filters = None
+    if after:
+        creation, name = after
+        # creation > c OR (creation = c AND name > n)
+        conditions.append(['creation', '>=', creation])
+        or_filters = [['creation', '>', creation], ['name', '>', name]]
+    return frappe.get_all(
+        'Leads',
+        filters=conditions,
+        or_filters=or_filters,
+        fields=['name', 'creation'],
+        order_by='creation asc, name asc',
+        limit=limit
+    )
+
+
+def iter_export_rows(lead_names, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Flat seat/amenity export rows, loading `batch_size` leads at a time
+    """
+    for start in range(0, len(lead_names), batch_size):
+        yield from export_rows_for_batch(lead_names[start:start + batch_size])
+
+
+def export_rows_for_batch(lead_names):
+    projections = get_lead_projection(lead_names, header_fields=('name1',))
+    for lead_id in lead_names:
+        projection = projections.get(lead_id)
+        if not projection:
+            continue
+        for line in projection[SEATS_TABLE] + projection[AMENITIES_TABLE]:
+            yield dict(line, lead_id=lead_id, lead_name=projection['header']['name1'] or '')
+
+
+def iter_export_chunks(rows, format_type='csv', include_header=True):
+    """
+    Encode export rows as CSV (csv module) or NDJSON, yielding ~CHUNK_SIZE byte chunks
+    """
+    buffer = io.StringIO()
+    if format_type == 'csv':
+        writer = csv.writer(buffer)
+        if include_header:
+            writer.writerow([header for header, _ in EXPORT_COLUMNS])
+        write = lambda row: writer.writerow([row.get(key) for _, key in EXPORT_COLUMNS])
+    elif format_type == 'ndjson':
+        write = lambda row: buffer.write(
+            json.dumps({key: row.get(key) for _, key in EXPORT_COLUMNS}, default=str) + '\n'
+        )
+    else:
+        frappe.throw(f'Unsupported export format: {format_type}')
+
+    for row in rows:
+        write(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_with_db(make_chunks):
+    """
+    Wrap a chunk generator for a streamed response body.
+    Frappe closes the request's DB connection before the body is iterated, so the
+    generator reconnects (keeping the session user) and closes again when done.
+    """
+    def stream():
+        if not getattr(frappe.db, '_conn', None):
+            frappe.connect(set_admin_as_user=False)
+        try:
+            yield from make_chunks()
+        finally:
+            frappe.db.close()
+    return stream()
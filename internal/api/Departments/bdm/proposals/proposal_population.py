@@ -1,9 +1,65 @@
 import frappe
 import json
 import datetime
+from frappe.utils import now_datetime
+from internal.api.Common.child_rows import bulk_insert_child_rows
+from internal.api.Departments.bdm.leads.billing import AMENITIES_TABLE, SEATS_TABLE, get_billing_totals
+from internal.api.Departments.bdm.leads.cache import invalidate_lead
 from internal.api.Departments.bdm.visiting_leads import get_leads
 
 
+# recursionType -> Leads child table the line is added to
+PROPOSAL_TABLES = {
+    "seats": "item",
+    "amenities": "amenity_recursion"
+}
+BILLING_ENTITY = "Millertech Spaces LLP"
+
+
+def build_proposal_row(item, today):
+    """
+    Child row for one proposal line item.
+    Returns (table fieldname, row dict), or (None, None) for unknown recursion types.
+    """
+    table = PROPOSAL_TABLES.get(item.get("recursionType"))
+    if not table:
+        return None, None
+    row = {
+        "item_code": item["productName"],
+        "sales_description": item.get("salesDescription"),
+        "start_date": today,
+        "stop_date": today,
+        "novel_billing_entity": BILLING_ENTITY,
+        "qty": item["qty"],
+        "rate": item["ratePerUnit"],
+        "amount": item["qty"] * item["ratePerUnit"]
+    }
+    if table == "item":
+        row["rollout_status"] = "CRF&MAF"
+    return table, row
+
+
+def validate_proposal_items(items):
+    """Errors for a proposal's line items (empty list when valid)"""
+    if not isinstance(items, list):
+        return ["Items must be a list"]
+    errors = []
+    for position, item in enumerate(items, 1):
+        if not item:
+            continue
+        if not isinstance(item, dict):
+            errors.append(f"Item {position}: must be an object")
+            continue
+        if item.get("recursionType") not in PROPOSAL_TABLES:
+            errors.append(f"Item {position}: recursionType must be one of {', '.join(PROPOSAL_TABLES)}")
+        if not item.get("productName"):
+            errors.append(f"Item {position}: productName is required")
+        for key in ("qty", "ratePerUnit"):
+            if isinstance(item.get(key), bool) or not isinstance(item.get(key), (int, float)):
+                errors.append(f"Item {position}: {key} must be a number")
+    return errors
+
+
 @frappe.whitelist(allow_guest=True)
 def create_proposal(data):
     lead_id = data.get("lead_id")
@@ -13,34 +69,107 @@ def create_proposal(data):
     items = data.get("items", [])
     if not isinstance(items, list):
         frappe.throw("Items must be a list")
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
     for item in items:
         if not item:
             continue
-        if item['recursionType'] == "seats":
-            child = doc.append("item", {})
-            child.item_code = item["productName"]
-            child.sales_description = item["salesDescription"]
-            child.start_date = datetime.datetime.now().strftime("%Y-%m-%d")
-            child.stop_date = datetime.datetime.now().strftime("%Y-%m-%d")
-            child.novel_billing_entity="Millertech Spaces LLP"
-            child.rollout_status = "CRF&MAF"
-            child.qty = item["qty"]
-            child.rate = item["ratePerUnit"]
-            child.amount = item["qty"] * item["ratePerUnit"]
-        if item['recursionType'] == "amenities":
-            child = doc.append("amenity_recursion", {})
-            child.item_code = item["productName"]
-            child.sales_description = item["salesDescription"]
-            child.start_date = datetime.datetime.now().strftime("%Y-%m-%d")
-            child.stop_date = datetime.datetime.now().strftime("%Y-%m-%d")
-            child.novel_billing_entity="Millertech Spaces LLP"
-            child.qty = item["qty"]
-            child.rate = item["ratePerUnit"]
-            child.amount = item["qty"] * item["ratePerUnit"]
+        table, row = build_proposal_row(item, today)
+        if table:
+            doc.append(table, row)
     doc.save(ignore_permissions=True)
     return {"name": doc.name1}
 
 
+@frappe.whitelist()
+def create_proposals(proposals=None):
+    """
+    Add proposal line items to many leads in one call.
+
+    Args:
+        proposals (list | str): [{lead_id, items: [...]}] in create_proposal's item
+            format; read from the JSON request body when not passed.
+
+    Every proposal is validated before anything is written; if any fails, nothing
+    is inserted and only the per-lead errors are returned. Otherwise rows are bulk
+    inserted per child table, each lead's `modified` is bumped once and its
+    seat/amenity totals are recomputed in grouped queries.
+
+    Returns:
+        dict: {success, results: [{lead_id, success, errors | seats_added, amenities_added, totals}]}
+    """
+    if proposals is None:
+        proposals = json.loads(frappe.request.get_data() or "[]")
+    elif isinstance(proposals, str):
+        proposals = json.loads(proposals)
+    if isinstance(proposals, dict):
+        proposals = proposals.get("proposals", [])
+    if not proposals:
+        frappe.throw("No proposals received")
+    if not isinstance(proposals, list):
+        frappe.throw("Proposals must be a list")
+    for position, proposal in enumerate(proposals, 1):
+        if not isinstance(proposal, dict):
+            frappe.throw(f"Proposal #{position} must be an object with lead_id and items")
+
+    lead_ids = list(dict.fromkeys(p.get("lead_id") for p in proposals if p.get("lead_id")))
+    existing = set(frappe.get_all("Leads", filters={"name": ["in", lead_ids]}, pluck="name")) if lead_ids else set()
+
+    errors = {}
+    for position, proposal in enumerate(proposals, 1):
+        lead_id = proposal.get("lead_id")
+        if not lead_id:
+            errors.setdefault(f"#{position}", []).append("Missing lead_id in proposal data")
+            continue
+        if lead_id not in existing:
+            errors.setdefault(lead_id, []).append(f"Lead {lead_id} not found")
+        errors.setdefault(lead_id, []).extend(validate_proposal_items(proposal.get("items", [])))
+
+    errors = {lead_id: lead_errors for lead_id, lead_errors in errors.items() if lead_errors}
+    if errors:
+        return {
+            "success": False,
+            "results": [
+                {"lead_id": lead_id, "success": False, "errors": lead_errors}
+                for lead_id, lead_errors in errors.items()
+            ]
+        }
+
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    rows = {table: {lead_id: [] for lead_id in lead_ids} for table in PROPOSAL_TABLES.values()}
+    for proposal in proposals:
+        for item in proposal.get("items", []):
+            if not item:
+                continue
+            table, row = build_proposal_row(item, today)
+            rows[table][proposal["lead_id"]].append(row)
+
+    for table, rows_by_lead in rows.items():
+        bulk_insert_child_rows("Leads", table, rows_by_lead)
+
+    frappe.db.sql("""
+        UPDATE `tabLeads`
+        SET modified = %(modified)s, modified_by = %(user)s
+        WHERE name IN %(leads)s
+    """, {"modified": now_datetime(), "user": frappe.session.user, "leads": tuple(lead_ids)})
+    for lead_id in lead_ids:
+        invalidate_lead(lead_id)
+
+    totals = get_billing_totals(lead_ids)
+    return {
+        "success": True,
+        "results": [
+            {
+                "lead_id": lead_id,
+                "success": True,
+                "seats_added": len(rows[SEATS_TABLE][lead_id]),
+                "amenities_added": len(rows[AMENITIES_TABLE][lead_id]),
+                "totals": totals[lead_id]
+            }
+            for lead_id in lead_ids
+        ]
+    }
+
+
 @frappe.whitelist(allow_guest=True)
 def submit_proposal():
     raw_data = frappe.request.get_data()
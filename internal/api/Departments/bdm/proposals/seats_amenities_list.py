@@ -1,16 +1,11 @@
 import frappe
+from internal.api.Departments.bdm.proposals.catalog import conditional_response, get_catalog
 
 def get_seats_list():
     """Get list of seats from the 'Leads Items for number of seats' doctype"""
     try:
-        # Get all documents from the doctype
-        seats_docs = frappe.get_all("Leads Items for number of seats", fields=["name"])
-        seats_list = []
-        
-        for seat_doc in seats_docs:
-            seats_list.append(seat_doc)
-        
-        return seats_list
+        # Served from the cached catalog snapshot
+        return get_catalog()["seats"]
     except Exception as e:
         frappe.log_error(f"Error fetching seats list: {str(e)}")
         return []
@@ -18,14 +13,8 @@ def get_seats_list():
 def get_amenities_list():
     """Get list of amenities from the 'Leads item for Amenities' doctype"""
     try:
-        # Get all documents from the doctype
-        amenities_docs = frappe.get_all("Leads item for Amenities", fields=["name"])
-        amenities_list = []
-        
-        for amenity_doc in amenities_docs:
-            amenities_list.append(amenity_doc)
-        
-        return amenities_list
+        # Served from the cached catalog snapshot
+        return get_catalog()["amenities"]
     except Exception as e:
         frappe.log_error(f"Error fetching amenities list: {str(e)}")
         return []
@@ -35,10 +24,10 @@ def get_seats_list_api():
     """API endpoint to get seats list"""
     try:
         seats = get_seats_list()
-        return {
+        return conditional_response({
             "status": "success",
             "message": seats
-        }
+        }, get_catalog()["version"])
     except Exception as e:
         frappe.log_error(f"API Error in get_seats_list_api: {str(e)}")
         return {
@@ -51,10 +40,10 @@ def get_amenities_list_api():
     """API endpoint to get amenities list"""
     try:
         amenities = get_amenities_list()
-        return {
+        return conditional_response({
             "status": "success",
             "message": amenities
-        }
+        }, get_catalog()["version"])
     except Exception as e:
         frappe.log_error(f"API Error in get_amenities_list_api: {str(e)}")
         return {
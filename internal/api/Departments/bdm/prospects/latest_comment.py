@@ -0,0 +1,68 @@
+import frappe
+
+# Denormalized copy of each lead's newest "Comment" on the Leads record itself
+# (custom fields added by internal.patches.v0_0.add_latest_comment_fields), so the
+# journey and list views read it without touching tabComment.
+LATEST_COMMENT_FIELD = "latest_comment"
+LATEST_COMMENT_ON_FIELD = "latest_comment_on"
+
+
+def _is_lead_comment(doc):
+    return doc.reference_doctype == "Leads" and doc.comment_type == "Comment" and doc.reference_name
+
+
+def _set_latest(lead, content, creation):
+    frappe.db.set_value("Leads", lead, {
+        LATEST_COMMENT_FIELD: content,
+        LATEST_COMMENT_ON_FIELD: creation
+    }, update_modified=False)
+
+
+def refresh_latest_comment(lead):
+    """Recompute the denormalized latest comment for one lead from tabComment"""
+    latest = frappe.db.sql("""
+        SELECT content, creation
+        FROM `tabComment`
+        WHERE
+            reference_doctype = 'Leads'
+            AND reference_name = %s
+            AND comment_type = 'Comment'
+        ORDER BY creation DESC
+        LIMIT 1
+    """, (lead,), as_dict=True)
+    if latest:
+        _set_latest(lead, latest[0].content, latest[0].creation)
+    else:
+        _set_latest(lead, None, None)
+
+
+def on_comment_change(doc, method=None):
+    """doc_events hook for Comment (on_update / after_delete)"""
+    if not _is_lead_comment(doc):
+        return
+    if doc.flags.in_insert:
+        # a new comment is always the latest one
+        _set_latest(doc.reference_name, doc.content, doc.creation)
+    else:
+        refresh_latest_comment(doc.reference_name)
+
+
+def backfill_latest_comments():
+    """Set the latest comment on every lead in one statement"""
+    frappe.db.sql(f"""
+        UPDATE `tabLeads` l
+        JOIN (
+            SELECT reference_name, MAX(creation) AS creation
+            FROM `tabComment`
+            WHERE reference_doctype = 'Leads' AND comment_type = 'Comment'
+            GROUP BY reference_name
+        ) lc ON lc.reference_name = l.name
+        JOIN `tabComment` c
+            ON c.reference_doctype = 'Leads'
+            AND c.comment_type = 'Comment'
+            AND c.reference_name = lc.reference_name
+            AND c.creation = lc.creation
+        SET
+            l.{LATEST_COMMENT_FIELD} = c.content,
+            l.{LATEST_COMMENT_ON_FIELD} = c.creation
+    """)
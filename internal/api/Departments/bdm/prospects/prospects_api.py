@@ -1,84 +1,198 @@
 import frappe
+import json
+from frappe.utils import cint, now_datetime
+from internal.api.Common.cursor import decode_cursor, encode_cursor
+from internal.api.Departments.bdm.leads.attachments import get_lead_attachments, invalidate_attachments
+
+PROSPECT_DETAILS_QUERY = """
+    SELECT 
+        l.name AS id,
+        l.name1 AS name,
+        l.company AS company,
+        v.date_and_time_of_visit AS dateandtime,
+        LEFT(UPPER(l.name1), 1) AS initials,
+        CASE
+            WHEN l.leasing_status IN ('Prospect', 'Active Prospect') THEN 'Todo'
+            WHEN l.leasing_status = 'Visited Prospect' THEN 'In Progress'
+            ELSE 'Unknown'
+        END AS status
+    FROM 
+        `tabLeads` l
+    JOIN 
+        `tabVisiting Prospects` v ON v.name = l.name
+    WHERE 
+        l.leasing_status IN ('Prospect', 'Visited Prospect', 'Active Prospect')
+        AND l.assignedto = %s
+"""
+
+def _latest_comments(lead_ids):
+    rows = frappe.db.sql("""
+        SELECT name, latest_comment, latest_comment_on
+        FROM `tabLeads`
+        WHERE name IN %(leads)s
+    """, {"leads": tuple(lead_ids)}, as_dict=True)
+    return {
+        row.name: {"latest_comment": row.latest_comment, "latest_comment_on": row.latest_comment_on}
+        for row in rows
+    }
+
+def _comment_counts(lead_ids):
+    rows = frappe.db.sql("""
+        SELECT reference_name, COUNT(*)
+        FROM `tabComment`
+        WHERE
+            reference_doctype = 'Leads'
+            AND reference_name IN %(leads)s
+            AND comment_type = 'Comment'
+        GROUP BY reference_name
+    """, {"leads": tuple(lead_ids)})
+    return {lead: {"comment_count": count} for lead, count in rows}
+
+def _attachment_counts(lead_ids):
+    rows = frappe.db.sql("""
+        SELECT attached_to_name, COUNT(*)
+        FROM `tabFile`
+        WHERE
+            attached_to_doctype = 'Leads'
+            AND attached_to_name IN %(leads)s
+        GROUP BY attached_to_name
+    """, {"leads": tuple(lead_ids)})
+    return {lead: {"attachment_count": count} for lead, count in rows}
+
+# include= name -> (loader returning {lead id: values}, values for leads with no rows)
+PROSPECT_ENRICHMENTS = {
+    "latest_comment": (_latest_comments, {"latest_comment": None, "latest_comment_on": None}),
+    "comment_count": (_comment_counts, {"comment_count": 0}),
+    "attachment_count": (_attachment_counts, {"attachment_count": 0}),
+}
 
 @frappe.whitelist()
 def get_prospect_details():
+    """
+    Prospect cards for a user.
+    Optional `include` (comma separated or JSON list) adds per-card enrichments from
+    PROSPECT_ENRICHMENTS, each loaded with one grouped query for the whole list.
+    """
     # user = frappe.session.user
     user = frappe.form_dict.get("user")
-    data = frappe.db.sql("""
-        SELECT 
-            l.name AS id,
-            l.name1 AS name,
-            l.company AS company,
-            v.date_and_time_of_visit AS dateandtime,
-            LEFT(UPPER(l.name1), 1) AS initials,
-            CASE
-                WHEN l.leasing_status IN ('Prospect', 'Active Prospect') THEN 'Todo'
-                WHEN l.leasing_status = 'Visited Prospect' THEN 'In Progress'
-                ELSE 'Unknown'
-            END AS status
-        FROM 
-            `tabLeads` l
-        JOIN 
-            `tabVisiting Prospects` v ON v.name = l.name
-        WHERE 
-            l.leasing_status IN ('Prospect', 'Visited Prospect', 'Active Prospect')
-            AND l.assignedto = %s
-    """, (user,), as_dict=True)
+    data = frappe.db.sql(PROSPECT_DETAILS_QUERY, (user,), as_dict=True)
+
+    include = frappe.form_dict.get("include")
+    if not include or not data:
+        return data
+    if isinstance(include, str):
+        include = json.loads(include) if include.startswith("[") else include.split(",")
+
+    lead_ids = [row.id for row in data]
+    for name in dict.fromkeys(item.strip() for item in include):
+        if name not in PROSPECT_ENRICHMENTS:
+            frappe.throw(f"Unsupported include: {name}")
+        loader, defaults = PROSPECT_ENRICHMENTS[name]
+        values = loader(lead_ids)
+        for row in data:
+            row.update(values.get(row.id, defaults))
     return data
 
-@frappe.whitelist()
-def get_prospect_journey_details():
-    lead = frappe.form_dict.get("prospectId")
-    data = frappe.db.sql("""
-         SELECT 
+# latest_comment is the hook-maintained copy of the newest Comment (see latest_comment.py)
+PROSPECT_JOURNEY_QUERY = """
+    SELECT 
         l.name AS id,
         l.leasing_status AS leasing_status, 
         l.name1 AS name, 
         l.company AS company, 
         DATE(v.date_and_time_of_visit) AS visit_date,
         LEFT(UPPER(l.name1), 1) AS initials,
-        c.content AS latest_comment
+        l.latest_comment AS latest_comment
     FROM 
         `tabLeads` l
     JOIN 
         `tabVisiting Prospects` v ON v.name = l.name
-    LEFT JOIN (
-        SELECT 
-            content, reference_name
-        FROM 
-            `tabComment`
-        WHERE 
-            comment_type = "Comment"
-            AND reference_doctype = "Leads"
-            AND reference_name = %s
-        ORDER BY 
-            creation DESC
-        LIMIT 1
-    ) c ON c.reference_name = l.name
     WHERE 
         l.name= %s
-    """,(lead,lead,),as_dict=True)
+"""
+
+@frappe.whitelist()
+def get_prospect_journey_details():
+    lead = frappe.form_dict.get("prospectId")
+    data = frappe.db.sql(PROSPECT_JOURNEY_QUERY,(lead,),as_dict=True)
     return data
 
+COMMENT_HISTORY_QUERY = """
+    SELECT 
+        DATE(creation) AS creation_date, 
+        content,
+        comment_by
+    FROM 
+        `tabComment`
+    WHERE 
+        comment_type = 'Comment'
+        AND reference_doctype = 'Leads'
+        AND reference_name = %s
+    ORDER BY 
+        creation_date DESC
+"""
+
 @frappe.whitelist()
 def get_comment_history():
     lead = frappe.form_dict.get("prospectId")
-    data = frappe.db.sql("""
-        SELECT 
-            DATE(creation) AS creation_date, 
-            content,
-            comment_by
-        FROM 
-            `tabComment`
-        WHERE 
-            comment_type = 'Comment'
-            AND reference_doctype = 'Leads'
-            AND reference_name = %s
-        ORDER BY 
-            creation_date DESC
-    """,(lead,),as_dict=True)
+    data = frappe.db.sql(COMMENT_HISTORY_QUERY,(lead,),as_dict=True)
     return data
 
+COMMENT_HISTORY_PAGE_QUERY = """
+    SELECT 
+        name AS id,
+        creation,
+        DATE(creation) AS creation_date, 
+        content,
+        comment_by
+    FROM 
+        `tabComment`
+    WHERE 
+        reference_doctype = 'Leads'
+        AND reference_name = %(lead)s
+        AND comment_type = 'Comment'
+        {cursor_condition}
+    ORDER BY 
+        creation DESC, name DESC
+    LIMIT %(limit)s
+"""
+
+@frappe.whitelist()
+def get_comment_history_page():
+    """
+    Newest-first comment history, one page at a time.
+    Pass back `nextCursor` as `cursor` for the following page; it is None on the last page.
+    """
+    lead = frappe.form_dict.get("prospectId")
+    cursor = frappe.form_dict.get("cursor")
+    limit = min(max(cint(frappe.form_dict.get("limit")) or 20, 1), 100)
+
+    try:
+        after = decode_cursor(cursor)
+    except ValueError:
+        return {"success": False, "message": "Invalid cursor"}
+
+    values = {"lead": lead, "limit": limit + 1}
+    cursor_condition = ""
+    if after:
+        values.update({"creation": after["value"], "name": after["name"]})
+        cursor_condition = "AND (creation < %(creation)s OR (creation = %(creation)s AND name < %(name)s))"
+
+    rows = frappe.db.sql(
+        COMMENT_HISTORY_PAGE_QUERY.format(cursor_condition=cursor_condition),
+        values,
+        as_dict=True
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].creation, rows[-1].id)
+
+    for row in rows:
+        row.pop("creation")
+    return {"data": rows, "nextCursor": next_cursor}
+
 @frappe.whitelist()
 def update_leasing_status_on_visit():
     lead = frappe.form_dict.get("lead")
@@ -91,103 +205,143 @@ def update_leasing_status_on_visit():
 def update_visit_details():
     lead = frappe.form_dict.get("lead")
     comment = frappe.form_dict.get("comment")
-    file_name = frappe.form_dict.get("file_name")
-    file_url = frappe.form_dict.get("file_url")
+    file_names = frappe.form_dict.get("file_name")
+    file_urls = frappe.form_dict.get("file_url")
     comment_by = frappe.form_dict.get("comment_by")
 
+    file_names = _as_list(file_names)
+    file_urls = _as_list(file_urls)
+
+    frappe.logger().info(f"Lead: {lead}, File Names: {file_names}, File URLs: {file_urls}, Comment By: {comment_by}")
+
+    files = [
+        (file_name.strip(), file_urls[i] if i < len(file_urls) else "")
+        for i, file_name in enumerate(file_names)
+        if file_name and file_name.strip()
+    ]
+
+    comment_lines = [comment or ""]
+    if files:
+        comment_lines.append("\nAttached Files:")
+        comment_lines.extend(
+            f"- {file_name} ({file_url})" if file_url else f"- {file_name}"
+            for file_name, file_url in files
+        )
+        comment_lines.append("")
+
     comment_doc = frappe.new_doc("Comment")
     comment_doc.comment_type = "Comment"
     comment_doc.reference_doctype = "Leads"
     comment_doc.reference_name = lead
-    comment_doc.content = comment
+    comment_doc.content = "Visit Comment: " + "\n".join(comment_lines)
     comment_doc.comment_by = comment_by
     comment_doc.insert()
 
-    file_doc = frappe.new_doc("File")
-    file_doc.file_name = file_name
-    file_doc.file_url = file_url
-    file_doc.attached_to_doctype = "Leads"
-    file_doc.attached_to_name = lead
-    file_doc.save()
+    # per-file status alongside the legacy "Success" message
+    frappe.response["files"] = attach_files_to_lead(lead, [file_url for _, file_url in files if file_url])
+
+    frappe.logger().info(f"Comment and file attachments saved successfully for lead: {lead}")
     return "Success"
 
 
+def _as_list(value):
+    """JSON list, or a comma-separated string as the visit form sends it"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = [part.strip() for part in value.split(",") if part.strip()]
+        if not isinstance(value, list):
+            value = [value]
+    return value or []
 
-@frappe.whitelist()
-def update_visit_details():
-    import os
-    import json
 
-    lead = frappe.form_dict.get("lead")
-    comment = frappe.form_dict.get("comment")
-    file_names = frappe.form_dict.get("file_name")
-    file_urls = frappe.form_dict.get("file_url")
-    comment_by = frappe.form_dict.get("comment_by")
+@frappe.whitelist()
+def attach_files_to_lead(lead, file_urls):
+    """
+    Link already-uploaded File records to a lead in bulk.
 
-    if isinstance(file_names, str):
-        try:
-            file_names = json.loads(file_names)
-        except:
-            file_names = [file_names]
-    
-    if isinstance(file_urls, str):
-        try:
-            file_urls = json.loads(file_urls)
-        except:
-            file_urls = [file_urls]
+    Files are resolved with one query and public ones re-linked with one UPDATE,
+    skipping File hooks and content hashing. Private files still go through
+    File.save so they are moved to the public folder like before. The caller needs
+    write permission on the lead and on every File it re-links.
 
-    frappe.logger().info(f"Lead: {lead}, File Names: {file_names}, File URLs: {file_urls}, Comment By: {comment_by}")
+    Returns:
+        list: [{file_url, status}] with status attached / already_attached / conflict
+        (attached to another lead) / not_permitted / not_found / error
+    """
+    frappe.has_permission("Leads", "write", lead, throw=True)
+    file_urls = list(dict.fromkeys(_as_list(file_urls)))
+    if not file_urls:
+        return []
 
-    comment_content = comment
-    if file_names and len(file_names) > 0 and file_names[0].strip():
-        comment_content += f"\n\nAttached Files:\n"
-        for i, file_name in enumerate(file_names):
-            if file_name.strip():
-                file_url = file_urls[i] if i < len(file_urls) else ""
-                comment_content += f"- {file_name}"
-                if file_url:
-                    comment_content += f" ({file_url})"
-                comment_content += "\n"
+    files_by_url = {}
+    for file in frappe.get_all(
+        "File",
+        filters={"file_url": ["in", file_urls]},
+        fields=["name", "file_url", "is_private", "attached_to_doctype", "attached_to_name"],
+        order_by="creation asc"
+    ):
+        files_by_url.setdefault(file.file_url, file)
 
-    comment_doc = frappe.new_doc("Comment")
-    comment_doc.comment_type = "Comment"
-    comment_doc.reference_doctype = "Leads"
-    comment_doc.reference_name = lead
-    comment_doc.content = f"Visit Comment: {comment_content}"
-    comment_doc.comment_by = comment_by
-    comment_doc.insert()
+    statuses = {}
+    public_names = []
+    for file_url in file_urls:
+        file = files_by_url.get(file_url)
+        if not file:
+            frappe.logger().warning(f"File document not found for URL: {file_url}")
+            statuses[file_url] = "not_found"
+        elif file.attached_to_doctype == "Leads" and file.attached_to_name == lead:
+            statuses[file_url] = "already_attached"
+        elif file.attached_to_doctype == "Leads":
+            frappe.logger().warning(f"File {file_url} is attached to Lead {file.attached_to_name}")
+            statuses[file_url] = "conflict"
+        elif not frappe.has_permission("File", "write", file.name):
+            statuses[file_url] = "not_permitted"
+        elif not file.is_private:
+            public_names.append(file.name)
+            statuses[file_url] = "attached"
+        else:
+            try:
+                file_doc = frappe.get_doc("File", file.name)
+                file_doc.attached_to_doctype = "Leads"
+                file_doc.attached_to_name = lead
+                file_doc.is_private = 0
+                file_doc.save()
+                statuses[file_url] = "attached"
+            except Exception as e:
+                frappe.logger().error(f"Error processing file {file_url}: {str(e)}")
+                statuses[file_url] = "error"
 
-    if file_names and len(file_names) > 0:
-        for i, file_name in enumerate(file_names):
-            if file_name.strip():
-                file_url = file_urls[i] if i < len(file_urls) else ""
-                if file_url:
-                    try:
-                        file_doc = frappe.get_doc("File", {"file_url": file_url})
-                        if not file_doc.attached_to_doctype or file_doc.attached_to_doctype != "Leads":
-                            file_doc.attached_to_doctype = "Leads"
-                            file_doc.attached_to_name = lead
-                            file_doc.is_private = 0
-                            file_doc.save()
-                            frappe.logger().info(f"File {file_name} properly attached to Lead {lead}")
-                    except frappe.DoesNotExistError:
-                        frappe.logger().warning(f"File document not found for URL: {file_url}")
-                    except Exception as e:
-                        frappe.logger().error(f"Error processing file {file_name}: {str(e)}")
+    if public_names:
+        frappe.db.sql("""
+            UPDATE `tabFile`
+            SET
+                attached_to_doctype = 'Leads',
+                attached_to_name = %(lead)s,
+                modified = %(now)s,
+                modified_by = %(user)s
+            WHERE name IN %(names)s
+        """, {
+            "lead": lead,
+            "now": now_datetime(),
+            "user": frappe.session.user,
+            "names": tuple(public_names)
+        })
+        # the bulk UPDATE bypasses the File hooks
+        invalidate_attachments([lead])
 
-    frappe.logger().info(f"Comment and file attachments saved successfully for lead: {lead}")
-    return "Success"
+    return [{"file_url": file_url, "status": statuses[file_url]} for file_url in file_urls]
 
 
 @frappe.whitelist()
 def get_files():
     lead = frappe.form_dict.get("lead")
-    data = frappe.db.sql("""
-        select file_name,file_url
-        from `tabFile` 
-        where attached_to_doctype = "Leads" and attached_to_name = %s
-    """,(lead,),as_dict=True)
-    return data
+    # served from the per-lead attachments cache
+    return [
+        {"file_name": file["file_name"], "file_url": file["file_url"]}
+        for file in get_lead_attachments([lead])[lead]
+    ]
 
 
 
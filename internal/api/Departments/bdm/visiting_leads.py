@@ -1,33 +1,116 @@
 import frappe
 import json
-from frappe.utils import get_datetime
+from frappe.utils import add_to_date, get_datetime, now_datetime
+from internal.api.Common.hierarchy import get_manager
+
+PROSPECT_COLUMNS = """
+        vp.name as id,
+        vp.name1 as name,
+        vp.company,
+        vp.mobile_number,
+        vp.email_id,
+        vp.lead_type,
+        vp.date_and_time_of_visit,
+        vp.visit_location1,
+        vp.visit_created_by_pre_sales,
+        vp.assigned_to,
+        vp.creation,
+        vp.claimed_by,
+        vp.claimed_on,
+        vp.removed_by"""
+
+# A prospect is in the claimable pool while unclaimed, not removed and still a prospect
+CLAIMABLE_CONDITION = """
+        (vp.claimed_by IS NULL OR vp.claimed_by = '')
+        AND (vp.claimed_on IS NULL OR vp.claimed_on = '')
+        AND (vp.removed_by IS NULL OR vp.removed_by = 0)
+        AND l.leasing_status IN ('Prospect', 'Active Prospect')"""
+
+CLAIMABLE_LEADS_QUERY = f"""
+    SELECT{PROSPECT_COLUMNS}
+    FROM `tabVisiting Prospects` vp
+    JOIN `tabLeads` l ON l.name = vp.name
+    WHERE{CLAIMABLE_CONDITION}
+"""
+
+# Prospects or their Leads touched since the watermark, flagged with pool membership.
+# Two index-friendly branches on `modified` instead of one OR across both tables.
+CHANGED_LEADS_QUERY = f"""
+    SELECT{PROSPECT_COLUMNS},
+        vp.modified,
+        l.leasing_status,
+        ({CLAIMABLE_CONDITION}
+        ) AS claimable
+    FROM `tabVisiting Prospects` vp
+    JOIN `tabLeads` l ON l.name = vp.name
+    WHERE vp.modified > %(since)s
+    UNION
+    SELECT{PROSPECT_COLUMNS},
+        vp.modified,
+        l.leasing_status,
+        ({CLAIMABLE_CONDITION}
+        ) AS claimable
+    FROM `tabLeads` l
+    JOIN `tabVisiting Prospects` vp ON vp.name = l.name
+    WHERE l.modified > %(since)s
+"""
+
+# Rows committed shortly before the watermark can carry an older `modified`;
+# re-scan this window on every poll (clients apply deltas idempotently).
+DELTA_OVERLAP_SECONDS = 5
 
 @frappe.whitelist()
 def get_leads():
-    return frappe.db.sql("""
-        SELECT
-            vp.name as id,
-            vp.name1 as name,
-            vp.company,
-            vp.mobile_number,
-            vp.email_id,
-            vp.lead_type,
-            vp.date_and_time_of_visit,
-            vp.visit_location1,
-            vp.visit_created_by_pre_sales,
-            vp.assigned_to,
-            vp.creation,
-            vp.claimed_by,
-            vp.claimed_on,
-            vp.removed_by
-        FROM `tabVisiting Prospects` vp
-        JOIN `tabLeads` l ON l.name = vp.name
-        WHERE
-            (vp.claimed_by IS NULL OR vp.claimed_by = '')
-            AND (vp.claimed_on IS NULL OR vp.claimed_on = '')
-            AND (vp.removed_by IS NULL OR vp.removed_by = 0)
-            AND l.leasing_status IN ('Prospect', 'Active Prospect')
-    """, as_dict=True)
+    return frappe.db.sql(CLAIMABLE_LEADS_QUERY, as_dict=True)
+
+
+@frappe.whitelist()
+def get_leads_delta(since=None):
+    """
+    Incremental claimable-leads feed.
+
+    Without `since` this returns the full pool. With `since` (the `watermark` of the
+    previous call) it returns only prospects added to or changed within the pool, and
+    tombstones for prospects that left it (claimed, removed or no longer a prospect).
+
+    Returns:
+        dict: {leads, tombstones, watermark, full}
+    """
+    # same clock (site timezone) that stamps `modified` on every save
+    watermark = now_datetime()
+
+    if not since:
+        return {
+            'leads': frappe.db.sql(CLAIMABLE_LEADS_QUERY, as_dict=True),
+            'tombstones': [],
+            'watermark': watermark,
+            'full': True
+        }
+
+    since = add_to_date(get_datetime(since), seconds=-DELTA_OVERLAP_SECONDS)
+    leads = []
+    tombstones = []
+    for row in frappe.db.sql(CHANGED_LEADS_QUERY, {'since': since}, as_dict=True):
+        claimable = row.pop('claimable')
+        row.pop('modified')
+        leasing_status = row.pop('leasing_status')
+        if claimable:
+            leads.append(row)
+        else:
+            tombstones.append({
+                'id': row['id'],
+                'claimed_by': row['claimed_by'],
+                'claimed_on': row['claimed_on'],
+                'removed_by': row['removed_by'],
+                'leasing_status': leasing_status
+            })
+
+    return {
+        'leads': leads,
+        'tombstones': tombstones,
+        'watermark': watermark,
+        'full': False
+    }
 
 
 @frappe.whitelist()
@@ -83,47 +166,39 @@ def claim_lead():
         str_to_dict = json.loads(child_fields_dict) if child_fields_dict else {}
         debug_info.append(f"Parsed child_fields_dict: {str_to_dict}")
 
-        # Visiting Prospects doc
-        visit_doc = frappe.get_doc('Visiting Prospects', lead_id)
-        debug_info.append(f"Fetched Visiting Prospects doc: {lead_id}")
-
-        if visit_doc.claimed_by:
-            frappe.response['message'] = f'This Lead has already been claimed by {visit_doc.claimed_by}'
-            debug_info.append(f"Already claimed: {lead_id} by {visit_doc.claimed_by}")
+        # Single conditional UPDATE: exactly one concurrent caller can win
+        claimed_on = now_datetime()
+        if not try_claim(lead_id, claimed_by, claimed_on):
+            current = frappe.db.get_value('Visiting Prospects', lead_id, 'claimed_by')
+            if current is None and not frappe.db.exists('Visiting Prospects', lead_id):
+                frappe.response['message'] = f'Visiting Prospect {lead_id} not found'
+            else:
+                frappe.response['message'] = f'This Lead has already been claimed by {current}'
+            debug_info.append(f"Claim lost: {lead_id} held by {current}")
             frappe.response['debug'] = '\n'.join(debug_info)
             return
 
-        visit_doc.claimed_by = claimed_by
-        visit_doc.claimed_on = get_datetime()
-        visit_doc.save(ignore_permissions=True)
-        debug_info.append(f"Saved Visiting Prospects: {lead_id}")
-
-        # Leads doc
-        lead_doc = frappe.get_doc('Leads', lead_id)
-        debug_info.append(f"Fetched Leads doc: {lead_id}")
-
-        lead_doc.assignedto = claimed_by
-        lead_doc.pre_sales_assigned_user = pre_sales
-        debug_info.append("Updated assignedto and pre_sales_assigned_user in Leads")
-
-        manager_id = frappe.db.get_value('Employee', {'user_id': claimed_by}, 'reports_to')
-        if manager_id:
-            manager_email = frappe.db.get_value('Employee', manager_id, 'user_id')
-            if manager_email:
-                lead_doc.managedby = manager_email
-                debug_info.append(f"Set managedby in Leads: {manager_email}")
-
-        if office_type == "Office" and str_to_dict:
-            lead_doc.append('visit_details', str_to_dict)
-            debug_info.append("Appended visit_details to Leads")
-
-        lead_doc.save(ignore_permissions=True)
-        debug_info.append(f"Saved Leads doc: {lead_id}")
-
         frappe.db.commit()
-        debug_info.append("Committed DB changes")
+        debug_info.append(f"Claimed Visiting Prospects: {lead_id}")
+
+        # Leads assignment and manager resolution run after the claim is committed
+        frappe.enqueue(
+            'internal.api.Departments.bdm.visiting_leads.finalize_claim',
+            queue='short',
+            lead_id=lead_id,
+            claimed_by=claimed_by,
+            pre_sales=pre_sales,
+            visit_details=str_to_dict if office_type == "Office" else None
+        )
+        debug_info.append("Enqueued Leads assignment")
 
-        frappe.publish_realtime(event='lead_claimed', message=lead_id)
+        # Enough for subscribers to drop the lead from their list without refetching
+        frappe.publish_realtime(event='lead_claimed', message={
+            'lead_id': lead_id,
+            'claimed_by': claimed_by,
+            'claimed_on': claimed_on,
+            'modified': claimed_on
+        })
         debug_info.append("Published realtime event")
 
         frappe.response['message'] = 'Lead Claimed Successfully'
@@ -136,6 +211,56 @@ def claim_lead():
         frappe.response['debug'] = '\n'.join(debug_info)
 
 
+def try_claim(lead_id, claimed_by, claimed_on=None):
+    """
+    Claim an unclaimed Visiting Prospect with one conditional UPDATE.
+    Returns True only for the caller whose update matched the row: the row is read
+    back in the same transaction and must carry this claimer and claim time, so
+    two claims by the same user cannot both win.
+    """
+    claimed_on = claimed_on or now_datetime()
+    frappe.db.sql("""
+        UPDATE `tabVisiting Prospects`
+        SET
+            claimed_by = %(claimed_by)s,
+            claimed_on = %(claimed_on)s,
+            modified = %(claimed_on)s,
+            modified_by = %(user)s
+        WHERE
+            name = %(lead_id)s
+            AND (claimed_by IS NULL OR claimed_by = '')
+    """, {
+        'lead_id': lead_id,
+        'claimed_by': claimed_by,
+        'claimed_on': claimed_on,
+        'user': frappe.session.user
+    })
+    claim = frappe.db.get_value(
+        'Visiting Prospects', lead_id, ['claimed_by', 'claimed_on'], as_dict=True, for_update=True
+    )
+    return bool(claim) and claim.claimed_by == claimed_by and get_datetime(claim.claimed_on) == get_datetime(claimed_on)
+
+
+def finalize_claim(lead_id, claimed_by, pre_sales=None, visit_details=None):
+    """
+    Follow-up to a won claim: assign the Leads record, resolve the claimer's manager
+    and append visit details. Runs as a background job outside the claim transaction.
+    """
+    lead_doc = frappe.get_doc('Leads', lead_id)
+    lead_doc.assignedto = claimed_by
+    lead_doc.pre_sales_assigned_user = pre_sales
+
+    manager_email = get_manager(claimed_by)
+    if manager_email:
+        lead_doc.managedby = manager_email
+
+    if visit_details:
+        lead_doc.append('visit_details', visit_details)
+
+    lead_doc.save(ignore_permissions=True)
+    frappe.db.commit()
+
+
 @frappe.whitelist()
 def remove_lead():
     data = frappe.form_dict
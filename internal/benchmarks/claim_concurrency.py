@@ -0,0 +1,89 @@
+"""
+Concurrency harness for visiting_leads.try_claim against the site's MariaDB.
+
+    bench --site <site> execute internal.benchmarks.claim_concurrency.run
+    bench --site <site> execute internal.benchmarks.claim_concurrency.run --kwargs "{'claimers': 50, 'rounds': 10}"
+
+Each round commits one fresh unclaimed Visiting Prospect, then fires `claimers`
+threads (one DB connection each) that claim it at the same instant. Asserts exactly
+one winner per round and reports the claim latency distribution. Seeded rows are
+deleted afterwards.
+"""
+
+import threading
+import time
+
+import frappe
+
+from internal.api.Departments.bdm.visiting_leads import try_claim
+from internal.benchmarks.utils import bench_user, emit, insert_fixture
+
+
+def _seed_prospect(round_no):
+    doc = insert_fixture({
+        "doctype": "Visiting Prospects",
+        "name1": f"Bench Claim {round_no}",
+    })
+    frappe.db.commit()
+    return doc.name
+
+
+def _claim_worker(site, lead_id, claimer, barrier, results):
+    frappe.init(site=site)
+    frappe.connect()
+    try:
+        barrier.wait(timeout=30)
+        start = time.perf_counter()
+        won = try_claim(lead_id, claimer)
+        frappe.db.commit()
+        results.append((won, (time.perf_counter() - start) * 1000))
+    finally:
+        frappe.destroy()
+
+
+def _percentile(samples, pct):
+    return round(samples[min(len(samples) - 1, int(len(samples) * pct))], 2)
+
+
+def run(claimers=20, rounds=5):
+    site = frappe.local.site
+    latencies = []
+    seeded = []
+    report = {"benchmark": "claim_concurrency", "claimers": claimers, "rounds": rounds, "winners": []}
+
+    try:
+        for round_no in range(rounds):
+            lead_id = _seed_prospect(round_no)
+            seeded.append(lead_id)
+
+            results = []
+            barrier = threading.Barrier(claimers)
+            threads = [
+                threading.Thread(
+                    target=_claim_worker,
+                    args=(site, lead_id, bench_user(f"claimer-{i}"), barrier, results),
+                )
+                for i in range(claimers)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            winners = sum(1 for won, _ in results if won)
+            report["winners"].append(winners)
+            latencies.extend(latency for _, latency in results)
+            assert winners == 1, f"round {round_no}: {winners} winners for {lead_id}"
+    finally:
+        for lead_id in seeded:
+            frappe.db.delete("Visiting Prospects", {"name": lead_id})
+        frappe.db.commit()
+
+    latencies.sort()
+    report["latency_ms"] = {
+        "p50": _percentile(latencies, 0.50),
+        "p95": _percentile(latencies, 0.95),
+        "p99": _percentile(latencies, 0.99),
+        "max": round(latencies[-1], 2),
+    }
+    return emit(report)
@@ -0,0 +1,63 @@
+"""
+Client list benchmark: per-lead get_doc vs. grouped child-table aggregation.
+
+    bench --site <site> execute internal.benchmarks.clients_list.run
+    bench --site <site> execute internal.benchmarks.clients_list.run --kwargs "{'scales': [10, 100]}"
+
+Seeded data is rolled back at the end of the run.
+"""
+
+import frappe
+
+from internal.api.Departments.bdm.clients.clients_api import build_client_row, get_clients_for_user
+from internal.api.Departments.bdm.leads.billing import empty_totals
+from internal.benchmarks.utils import as_user, bench_user, emit, seed_client_leads, timed
+
+DEFAULT_SCALES = (10, 100, 1000)
+
+
+def legacy_get_clients_for_user():
+    """The previous implementation: one full Leads document per client"""
+    leads = frappe.db.get_all(
+        "Leads",
+        filters={"leasing_status": "Client", "assignedto": frappe.session.user},
+        fields=[
+            "name", "name1", "mobile_phone", "primary_email", "leasing_status",
+            "assignedto", "secondary_email", "whatsapp_link_1", "whatsapp_link_2"
+        ]
+    )
+    results = []
+    for lead in leads:
+        lead_doc = frappe.get_doc("Leads", lead["name"])
+        totals = empty_totals()
+        for item in lead_doc.item or []:
+            totals["seats_qty"] += item.get("qty", 0) or 0
+            totals["seats_amount"] += item.get("amount", 0) or 0
+        for amenity in lead_doc.amenity_recursion or []:
+            totals["amenities_qty"] += amenity.get("qty", 0) or 0
+            totals["amenities_amount"] += amenity.get("amount", 0) or 0
+        results.append(build_client_row(lead, totals))
+    return results
+
+
+def run(scales=DEFAULT_SCALES, repeat=5):
+    report = {"benchmark": "clients_list", "repeat": repeat, "results": []}
+    try:
+        for scale in scales:
+            user = bench_user(f"clients-{scale}")
+            seed_client_leads(scale, user)
+
+            legacy = as_user(user, legacy_get_clients_for_user)
+            current = as_user(user, get_clients_for_user)
+            if sorted(legacy, key=lambda r: r["id"]) != sorted(current, key=lambda r: r["id"]):
+                frappe.throw(f"Payload mismatch between legacy and aggregated paths at {scale} leads")
+
+            report["results"].append({
+                "leads": scale,
+                "legacy": timed(lambda: as_user(user, legacy_get_clients_for_user), repeat),
+                "aggregated": timed(lambda: as_user(user, get_clients_for_user), repeat),
+            })
+    finally:
+        frappe.db.rollback()
+
+    return emit(report)
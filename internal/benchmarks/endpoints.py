@@ -0,0 +1,70 @@
+"""
+BDM endpoint benchmark over a synthetic dataset at several scales.
+
+    bench --site <site> execute internal.benchmarks.endpoints.run
+    bench --site <site> execute internal.benchmarks.endpoints.run --kwargs "{'scales': [10, 100], 'repeat': 3}"
+
+For each scale, seed.seed_dataset builds clients, prospects, comments, files,
+visiting prospects and space plans for one synthetic user. Each endpoint is then
+timed (min/median/max over `repeat` warm calls) and its query count recorded.
+The JSON report is printed so runs can be diffed in review. Seeded data is
+rolled back at the end of every scale. test_benchmarks runs it at a small scale
+under `bench run-tests`.
+"""
+
+import frappe
+
+from internal.api.Common.loginRole import invalidate_roles, loginUser_roles
+from internal.api.Departments.bdm.clients.clients_api import get_client_details, get_clients_for_user
+from internal.api.Departments.bdm.layouts.space_plan import get_space_plan_by_lead
+from internal.api.Departments.bdm.prospects.prospects_api import get_prospect_details
+from internal.api.Departments.bdm.visiting_leads import get_leads
+from internal.benchmarks.seed import seed_dataset
+from internal.benchmarks.utils import as_user, bench_user, count_queries, emit, timed
+
+DEFAULT_SCALES = (10, 100, 1000)
+
+
+def prospect_details(user):
+    frappe.form_dict.update({"user": user, "include": "latest_comment,comment_count,attachment_count"})
+    return get_prospect_details()
+
+
+def get_endpoints(user, dataset):
+    """name -> zero-argument callable for every benchmarked endpoint"""
+    client = dataset["clients"][0]
+    space_plan_lead = dataset["space_plans"][0]
+    return {
+        "get_clients_for_user": lambda: as_user(user, get_clients_for_user),
+        "get_client_details": lambda: get_client_details(client),
+        "get_prospect_details": lambda: prospect_details(user),
+        "visiting_leads.get_leads": get_leads,
+        "get_space_plan_by_lead": lambda: get_space_plan_by_lead(space_plan_lead),
+        "loginUser_roles": lambda: loginUser_roles(user),
+    }
+
+
+def measure(fn, repeat):
+    fn()  # warm meta, compiled queries and caches
+    with count_queries() as queries:
+        fn()
+    return dict(timed(fn, repeat), queries=len(queries))
+
+
+def run(scales=DEFAULT_SCALES, repeat=5):
+    report = {"benchmark": "bdm_endpoints", "repeat": repeat, "results": []}
+    for scale in scales:
+        user = bench_user(f"endpoints-{scale}")
+        try:
+            dataset = seed_dataset(scale, user)
+            report["results"].append({
+                "scale": scale,
+                "endpoints": {
+                    name: measure(fn, repeat)
+                    for name, fn in get_endpoints(user, dataset).items()
+                },
+            })
+        finally:
+            frappe.db.rollback()
+            invalidate_roles()
+    return emit(report)
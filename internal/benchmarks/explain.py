@@ -0,0 +1,76 @@
+"""
+EXPLAIN-based check for the app's hot whitelisted queries.
+
+    bench --site <site> execute internal.benchmarks.explain.run
+    bench --site <site> execute internal.benchmarks.explain.run --kwargs "{'min_rows': 0}"
+
+Fails (AssertionError) if any registered query plans a full table scan over a table
+estimated at `min_rows` rows or more. Tiny tables are skipped by default because the
+optimizer legitimately prefers scanning them.
+
+Coverage is limited to the queries listed in get_registered_queries; a new hot query
+is only checked once it is added there. test_benchmarks runs the check over a seeded
+dataset under `bench run-tests`.
+"""
+
+import frappe
+
+from internal.api.Departments.bdm.clients.clients_api import CLIENT_LIST_FIELDS
+from internal.api.Departments.bdm.prospects.prospects_api import (
+    COMMENT_HISTORY_PAGE_QUERY,
+    COMMENT_HISTORY_QUERY,
+    PROSPECT_DETAILS_QUERY,
+    PROSPECT_JOURNEY_QUERY,
+)
+from internal.api.Departments.bdm.visiting_leads import CHANGED_LEADS_QUERY, CLAIMABLE_LEADS_QUERY
+from internal.benchmarks.utils import emit
+
+SAMPLE_USER = "explain@bench.internal.local"
+SAMPLE_LEAD = "LEAD-EXPLAIN"
+
+
+def get_registered_queries():
+    """(endpoint, sql, params) for every query the check covers"""
+    return [
+        ("clients_api.get_clients_for_user", frappe.get_all(
+            "Leads",
+            filters={"leasing_status": "Client", "assignedto": SAMPLE_USER},
+            fields=CLIENT_LIST_FIELDS,
+            run=0,
+        ), ()),
+        ("prospects_api.get_prospect_details", PROSPECT_DETAILS_QUERY, (SAMPLE_USER,)),
+        ("prospects_api.get_prospect_journey_details", PROSPECT_JOURNEY_QUERY, (SAMPLE_LEAD,)),
+        ("prospects_api.get_comment_history", COMMENT_HISTORY_QUERY, (SAMPLE_LEAD,)),
+        ("prospects_api.get_comment_history_page", COMMENT_HISTORY_PAGE_QUERY.format(cursor_condition=""),
+            {"lead": SAMPLE_LEAD, "limit": 21}),
+        ("visiting_leads.get_leads", CLAIMABLE_LEADS_QUERY, ()),
+        ("visiting_leads.get_leads_delta", CHANGED_LEADS_QUERY, {"since": "2000-01-01"}),
+    ]
+
+
+def find_full_scans(query, params=(), min_rows=1000):
+    """Plan rows that scan a whole real table (derived tables are ignored)"""
+    plan = frappe.db.sql(f"EXPLAIN {query}", params or None, as_dict=True)
+    return [
+        row for row in plan
+        if row.get("type") == "ALL"
+        and not (row.get("table") or "").startswith("<")
+        and (row.get("rows") or 0) >= min_rows
+    ]
+
+
+def run(min_rows=1000):
+    report = {"benchmark": "explain", "min_rows": min_rows, "results": []}
+    failures = []
+    for endpoint, query, params in get_registered_queries():
+        scans = find_full_scans(query, params, min_rows)
+        report["results"].append({
+            "endpoint": endpoint,
+            "full_scans": [{"table": row["table"], "rows": row["rows"]} for row in scans],
+        })
+        if scans:
+            failures.append(endpoint)
+
+    emit(report)
+    assert not failures, f"Full table scans planned for: {', '.join(failures)}"
+    return report
@@ -0,0 +1,101 @@
+"""
+End-to-end check for the background lead export job, including resume after failure.
+
+    bench --site <site> execute internal.benchmarks.export_job.run
+    bench --site <site> execute internal.benchmarks.export_job.run --kwargs "{'leads': 50, 'batch_size': 10}"
+
+A worker killed mid-job (job left Running) is simulated too, via a stale heartbeat.
+The job body runs in-process so the check does not depend on a worker being up. To
+exercise the queued path, call export_jobs.start_lead_export_job from a session and
+run `bench worker --queue long`. The job commits its File, so seeded leads and the
+File are deleted explicitly at the end.
+"""
+
+import frappe
+from frappe.utils import add_to_date, now_datetime
+
+from internal.api.Departments.bdm.proposals import export_jobs
+from internal.benchmarks.utils import as_user, bench_user, emit, seed_client_leads
+
+SEATS_PER_LEAD = 3
+AMENITIES_PER_LEAD = 2
+
+
+def _failing_on(batch_no, rows_for_batch):
+    """export_rows_for_batch that raises once, on the `batch_no`-th call"""
+    calls = {"count": 0}
+
+    def rows(lead_names):
+        calls["count"] += 1
+        if calls["count"] == batch_no + 1:
+            raise RuntimeError("simulated export failure")
+        return rows_for_batch(lead_names)
+    return rows
+
+
+def _mark_running(job_id, seconds_ago):
+    """Set a job to Running with a heartbeat `seconds_ago` old, as a killed worker leaves it"""
+    job = export_jobs.get_job(job_id)
+    job["status"] = "Running"
+    job["updated_on"] = str(add_to_date(now_datetime(), seconds=-seconds_ago))
+    frappe.cache().set_value(export_jobs._job_key(job_id), job)
+
+
+def run(leads=20, batch_size=5, fail_batch=2):
+    user = bench_user("export-job")
+    lead_names = seed_client_leads(leads, user, SEATS_PER_LEAD, AMENITIES_PER_LEAD)
+    frappe.db.commit()
+    report = {"benchmark": "export_job", "leads": leads, "batch_size": batch_size}
+    file_url = None
+
+    try:
+        started = as_user(user, lambda: export_jobs.start_lead_export_job(
+            assignedto=user, batch_size=batch_size
+        ))
+        job_id = started["job_id"]
+
+        original = export_jobs.export_rows_for_batch
+        export_jobs.export_rows_for_batch = _failing_on(fail_batch, original)
+        try:
+            export_jobs.run_export_job(job_id)
+        finally:
+            export_jobs.export_rows_for_batch = original
+
+        failed = export_jobs.get_job(job_id)
+        assert failed["status"] == "Failed", failed["status"]
+        assert failed["batches_done"] == fail_batch, failed["batches_done"]
+
+        as_user(user, lambda: export_jobs.resume_lead_export_job(job_id))
+
+        # a worker killed mid-job leaves it Running; resumable only once its heartbeat is stale
+        _mark_running(job_id, seconds_ago=0)
+        assert not export_jobs.is_stale(export_jobs.get_job(job_id))
+        _mark_running(job_id, seconds_ago=export_jobs.EXPORT_JOB_STALE_SECONDS + 60)
+        as_user(user, lambda: export_jobs.resume_lead_export_job(job_id))
+        export_jobs.run_export_job(job_id)
+
+        done = export_jobs.get_job(job_id)
+        file_url = done["file_url"]
+        assert done["status"] == "Completed", done
+        content = frappe.get_doc("File", {"file_url": file_url}).get_content()
+        if isinstance(content, bytes):
+            content = content.decode()
+        lines = content.splitlines()
+        expected = 1 + leads * (SEATS_PER_LEAD + AMENITIES_PER_LEAD)
+        assert len(lines) == expected, f"{len(lines)} lines, expected {expected}"
+        assert lines.count(lines[0]) == 1, "header written more than once"
+
+        report.update({
+            "job_id": job_id,
+            "batches": done["total_batches"],
+            "resumed_from_batch": fail_batch,
+            "lines": len(lines),
+            "bytes": done["bytes_written"],
+        })
+    finally:
+        if file_url:
+            frappe.delete_doc("File", frappe.db.get_value("File", {"file_url": file_url}), ignore_permissions=True)
+        for name in lead_names:
+            frappe.delete_doc("Leads", name, ignore_permissions=True, force=True)
+        frappe.db.commit()
+    return emit(report)
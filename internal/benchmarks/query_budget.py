@@ -0,0 +1,41 @@
+"""
+Query-count regression checks for endpoints that must run in a fixed number of queries.
+
+    bench --site <site> execute internal.benchmarks.query_budget.run
+
+Raises AssertionError when an endpoint exceeds its budget. Seeded data is rolled back.
+"""
+
+import frappe
+
+from internal.api.Departments.bdm.layouts.space_plan import get_space_plan_by_lead
+from internal.benchmarks.utils import count_queries, emit, seed_space_plan
+
+# header, locations, required items, PDFs
+SPACE_PLAN_BY_LEAD_BUDGET = 4
+
+
+def check_space_plan_by_lead():
+    lead_id = "LEAD-BENCH-SPACE-PLAN"
+    seed_space_plan(lead_id, items=200)
+
+    # warm meta and compiled queries so only request-time queries are counted
+    get_space_plan_by_lead(lead_id)
+    with count_queries() as queries:
+        result = get_space_plan_by_lead(lead_id)
+
+    assert result.get("exists"), result
+    assert len(result["data"]["items"]) == 100, "required filter should keep only required=1 items"
+    assert len(queries) <= SPACE_PLAN_BY_LEAD_BUDGET, (
+        f"get_space_plan_by_lead ran {len(queries)} queries (budget {SPACE_PLAN_BY_LEAD_BUDGET}):\n"
+        + "\n".join(queries)
+    )
+    return {"endpoint": "get_space_plan_by_lead", "queries": len(queries), "budget": SPACE_PLAN_BY_LEAD_BUDGET}
+
+
+def run():
+    try:
+        report = {"benchmark": "query_budget", "results": [check_space_plan_by_lead()]}
+    finally:
+        frappe.db.rollback()
+    return emit(report)
@@ -0,0 +1,118 @@
+"""
+Synthetic BDM dataset for benchmarks.
+
+seed_dataset(scale, user) inserts, for one assignee:
+    - `scale` client Leads with seat/amenity rows (utils.seed_client_leads)
+    - `scale` prospect Leads with matching Visiting Prospects, half of them claimable
+    - comments and File attachments on every lead (bulk inserted), with the
+      denormalized latest comment backfilled
+    - a Space Plan on every tenth client lead
+    - an Internal App Role listing the user as a TL
+
+Documents go through utils.insert_fixture, so this works on a bare site.
+Callers roll back (or delete) the data themselves.
+"""
+
+import random
+
+import frappe
+from frappe.utils import add_days, now_datetime
+
+from internal.api.Departments.bdm.prospects.latest_comment import backfill_latest_comments
+from internal.benchmarks.utils import BENCH_USER_DOMAIN, insert_fixture, seed_client_leads, seed_space_plan
+
+PROSPECT_STATUSES = ("Prospect", "Active Prospect", "Visited Prospect")
+FILE_TYPES = ("pdf", "png", "jpg", "docx", "xlsx")
+SPACE_PLAN_EVERY = 10
+
+
+def seed_prospects(count, assignee, seed=0):
+    """Prospect Leads plus their Visiting Prospects (same name); every other one is claimable"""
+    rng = random.Random(seed)
+    names = []
+    for i in range(count):
+        lead = insert_fixture({
+            "doctype": "Leads",
+            "name1": f"Bench Prospect {i}",
+            "company": f"Bench Co {i % 50}",
+            "leasing_status": rng.choice(PROSPECT_STATUSES),
+            "assignedto": assignee,
+            "mobile_phone": f"91000{i:05d}",
+            "primary_email": f"prospect{i}@{BENCH_USER_DOMAIN}",
+        })
+        claimed = i % 2
+        insert_fixture({
+            "doctype": "Visiting Prospects",
+            "name1": lead.name1,
+            "company": lead.company,
+            "date_and_time_of_visit": add_days(now_datetime(), rng.randint(-30, 30)),
+            "claimed_by": assignee if claimed else None,
+            "claimed_on": now_datetime() if claimed else None,
+            "removed_by": 0,
+        }, name=lead.name)
+        names.append(lead.name)
+    return names
+
+
+def seed_comments(lead_names, assignee, per_lead=5):
+    """`per_lead` Comments on each lead in one bulk insert, then backfill latest_comment"""
+    timestamp = now_datetime()
+    fields = [
+        "name", "owner", "creation", "modified", "modified_by", "comment_type",
+        "reference_doctype", "reference_name", "content", "comment_email"
+    ]
+    values = [
+        [
+            frappe.generate_hash(length=10), assignee, add_days(timestamp, -j), timestamp, assignee,
+            "Comment", "Leads", lead, f"Bench comment {j} on {lead}", assignee
+        ]
+        for lead in lead_names
+        for j in range(per_lead)
+    ]
+    frappe.db.bulk_insert("Comment", fields, values)
+    backfill_latest_comments()
+
+
+def seed_files(lead_names, assignee, per_lead=3, seed=0):
+    """`per_lead` File records attached to each lead (rows only, nothing on disk)"""
+    rng = random.Random(seed)
+    timestamp = now_datetime()
+    fields = [
+        "name", "owner", "creation", "modified", "modified_by", "file_name", "file_url",
+        "file_size", "is_private", "is_folder", "attached_to_doctype", "attached_to_name"
+    ]
+    values = []
+    for lead in lead_names:
+        for j in range(per_lead):
+            file_name = f"bench-{lead}-{j}.{rng.choice(FILE_TYPES)}"
+            values.append([
+                frappe.generate_hash(length=10), assignee, timestamp, timestamp, assignee,
+                file_name, f"/files/{file_name}", rng.randint(1_000, 5_000_000), 0, 0, "Leads", lead
+            ])
+    frappe.db.bulk_insert("File", fields, values)
+
+
+def seed_tl_role(user):
+    return insert_fixture({
+        "doctype": "Internal App Role",
+        "department": "BDM",
+        "tls": [{"user_link": user}],
+    })
+
+
+def seed_dataset(scale, user, seed=0):
+    """
+    Full synthetic dataset for `user` at `scale` leads per kind.
+
+    Returns:
+        dict: {clients, prospects, space_plans}: lists of seeded names
+    """
+    clients = seed_client_leads(scale, user)
+    prospects = seed_prospects(scale, user, seed)
+    seed_comments(clients + prospects, user)
+    seed_files(clients + prospects, user, seed=seed)
+    space_plans = clients[::SPACE_PLAN_EVERY]
+    for lead in space_plans:
+        seed_space_plan(lead, locations=3, items=50)
+    seed_tl_role(user)
+    return {"clients": clients, "prospects": prospects, "space_plans": space_plans}
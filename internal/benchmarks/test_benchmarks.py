@@ -0,0 +1,48 @@
+"""
+Benchmark regression checks for `bench run-tests`.
+
+    bench --site <site> run-tests --app internal --module internal.benchmarks.test_benchmarks
+
+Runs the endpoint benchmark and query budgets at a small scale. Timings are only
+reported; what fails the run is a query count that grows with the number of leads
+(an N+1), an endpoint over its fixed budget, or a full table scan planned for one of
+explain's registered queries over a seeded dataset.
+"""
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from internal.api.Common.loginRole import invalidate_roles
+from internal.benchmarks import endpoints, explain, query_budget
+from internal.benchmarks.seed import seed_dataset
+from internal.benchmarks.utils import bench_user
+
+SMALL_SCALES = (5, 20)
+# 100 leads per kind seeds 1000 comments, enough for the optimizer to prefer an index
+EXPLAIN_SCALE = 100
+EXPLAIN_MIN_ROWS = 500
+
+
+class TestBenchmarks(FrappeTestCase):
+    def test_endpoint_queries_do_not_grow_with_leads(self):
+        report = endpoints.run(scales=SMALL_SCALES, repeat=1)
+        small, large = (result["endpoints"] for result in report["results"])
+        for name, stats in large.items():
+            self.assertLessEqual(
+                stats["queries"], small[name]["queries"],
+                f"{name}: {small[name]['queries']} queries at {SMALL_SCALES[0]} leads, "
+                f"{stats['queries']} at {SMALL_SCALES[1]}"
+            )
+
+    def test_query_budgets(self):
+        report = query_budget.run()
+        for result in report["results"]:
+            self.assertLessEqual(result["queries"], result["budget"], result["endpoint"])
+
+    def test_no_full_scans(self):
+        try:
+            seed_dataset(EXPLAIN_SCALE, bench_user("explain"))
+            explain.run(min_rows=EXPLAIN_MIN_ROWS)
+        finally:
+            frappe.db.rollback()
+            invalidate_roles()
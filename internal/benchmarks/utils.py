@@ -0,0 +1,116 @@
+import json
+import time
+from contextlib import contextmanager
+
+import frappe
+
+BENCH_USER_DOMAIN = "bench.internal.local"
+
+
+def bench_user(label):
+    """Synthetic assignee used to isolate seeded data from real records"""
+    return f"{label}@{BENCH_USER_DOMAIN}"
+
+
+def insert_fixture(doc, name=None):
+    """
+    Insert a synthetic document with link, mandatory and validation checks skipped,
+    so seeding works on a bare site. `name` forces the document name.
+    """
+    doc = frappe.get_doc(doc)
+    doc.flags.ignore_links = True
+    doc.flags.ignore_mandatory = True
+    doc.flags.ignore_validate = True
+    doc.insert(ignore_permissions=True, set_name=name)
+    return doc
+
+
+def seed_client_leads(count, assignee, seats_per_lead=3, amenities_per_lead=2):
+    """
+    Insert `count` client Leads assigned to `assignee`, each with seat and amenity rows
+    """
+    names = []
+    for i in range(count):
+        doc = insert_fixture({
+            "doctype": "Leads",
+            "name1": f"Bench Client {i}",
+            "leasing_status": "Client",
+            "assignedto": assignee,
+            "mobile_phone": f"90000{i:05d}",
+            "primary_email": f"client{i}@{BENCH_USER_DOMAIN}",
+            "item": [
+                {"item_code": f"Seat {j}", "qty": j + 1, "rate": 1000, "amount": (j + 1) * 1000}
+                for j in range(seats_per_lead)
+            ],
+            "amenity_recursion": [
+                {"item_code": f"Amenity {j}", "qty": 1, "rate": 500, "amount": 500}
+                for j in range(amenities_per_lead)
+            ],
+        })
+        names.append(doc.name)
+    return names
+
+
+def timed(fn, repeat=5):
+    """Run fn `repeat` times and return min/median/max wall time in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "min_ms": round(samples[0], 2),
+        "median_ms": round(samples[len(samples) // 2], 2),
+        "max_ms": round(samples[-1], 2),
+    }
+
+
+def as_user(user, fn):
+    """Call fn with frappe.session.user switched to `user`"""
+    previous = frappe.session.user
+    frappe.set_user(user)
+    try:
+        return fn()
+    finally:
+        frappe.set_user(previous)
+
+
+def emit(report):
+    """Print a benchmark report as JSON so it can be diffed or parsed in review"""
+    print(json.dumps(report, indent=2, default=str))
+    return report
+
+
+@contextmanager
+def count_queries():
+    """Collect every query sent through frappe.db.sql inside the block"""
+    queries = []
+    original = frappe.db.sql
+
+    def counting_sql(query, *args, **kwargs):
+        queries.append(query)
+        return original(query, *args, **kwargs)
+
+    frappe.db.sql = counting_sql
+    try:
+        yield queries
+    finally:
+        del frappe.db.sql
+
+
+def seed_space_plan(lead_id, locations=5, items=200):
+    """Insert a Space Plan for `lead_id` with location rows and a mix of required/optional items"""
+    return insert_fixture({
+        "doctype": "Space Plan",
+        "lead_id": lead_id,
+        "status": "Required",
+        "location": [
+            {"location": f"Location {i}", "floor": str(i), "attachment": "dummy.pdf"}
+            for i in range(locations)
+        ],
+        "item_table": [
+            {"category": "Furniture", "item": f"Item {i}", "required": i % 2, "quantity": 1}
+            for i in range(items)
+        ],
+    })
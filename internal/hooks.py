@@ -124,6 +124,49 @@ app_include_js = "/assets/internal/js/internal.js"
 # 	}
 # }
 
+doc_events = {
+	"*": {
+		"on_change": "internal.api.Departments.bdm.leads.cache.on_child_change",
+		"on_trash": "internal.api.Departments.bdm.leads.cache.on_child_change"
+	},
+	"Leads": {
+		"on_change": [
+			"internal.api.Departments.bdm.leads.cache.on_lead_change",
+			"internal.api.Departments.bdm.maf.maf_api.invalidate_lead_name"
+		],
+		"on_trash": [
+			"internal.api.Departments.bdm.leads.cache.on_lead_change",
+			"internal.api.Departments.bdm.maf.maf_api.invalidate_lead_name"
+		]
+	},
+	"Employee": {
+		"on_change": "internal.api.Common.hierarchy.invalidate_manager_map",
+		"on_trash": "internal.api.Common.hierarchy.invalidate_manager_map"
+	},
+	"Internal App Role": {
+		"on_change": "internal.api.Common.loginRole.invalidate_roles",
+		"on_trash": "internal.api.Common.loginRole.invalidate_roles"
+	},
+	"File": {
+		"on_change": "internal.api.Departments.bdm.leads.attachments.on_file_change",
+		"on_trash": "internal.api.Departments.bdm.leads.attachments.on_file_change"
+	},
+	"Comment": {
+		"on_update": "internal.api.Departments.bdm.prospects.latest_comment.on_comment_change",
+		"after_delete": "internal.api.Departments.bdm.prospects.latest_comment.on_comment_change"
+	},
+	"Leads Items for number of seats": {
+		"on_change": "internal.api.Departments.bdm.proposals.catalog.invalidate_catalog",
+		"on_trash": "internal.api.Departments.bdm.proposals.catalog.invalidate_catalog",
+		"after_rename": "internal.api.Departments.bdm.proposals.catalog.invalidate_catalog"
+	},
+	"Leads item for Amenities": {
+		"on_change": "internal.api.Departments.bdm.proposals.catalog.invalidate_catalog",
+		"on_trash": "internal.api.Departments.bdm.proposals.catalog.invalidate_catalog",
+		"after_rename": "internal.api.Departments.bdm.proposals.catalog.invalidate_catalog"
+	}
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -176,12 +219,16 @@ app_include_js = "/assets/internal/js/internal.js"
 # Request Events
 # ----------------
 # before_request = ["internal.utils.before_request"]
-# after_request = ["internal.utils.after_request"]
+before_request = ["internal.api.Common.instrumentation.start_request"]
+after_request = [
+	"internal.api.Common.instrumentation.record_request",
+	"internal.api.Common.tracing.flush_after_request"
+]
 
 # Job Events
 # ----------
 # before_job = ["internal.utils.before_job"]
-# after_job = ["internal.utils.after_job"]
+after_job = ["internal.api.Common.tracing.flush_after_job"]
 
 # User Data Protection
 # --------------------
@@ -0,0 +1,20 @@
+import frappe
+
+# unbounded text columns cannot be indexed without a prefix length
+TEXT_FIELDTYPES = ("Small Text", "Text", "Long Text", "Text Editor", "Code")
+
+
+def add_indexes(indexes):
+    """
+    Create (doctype, columns, index name) indexes, skipping missing tables or
+    columns and unbounded text columns so patches run on partially set-up sites
+    """
+    for doctype, columns, index_name in indexes:
+        if not frappe.db.table_exists(doctype):
+            continue
+        if not all(frappe.db.has_column(doctype, column) for column in columns):
+            continue
+        meta = frappe.get_meta(doctype)
+        if any((meta.get_field(column) and meta.get_field(column).fieldtype) in TEXT_FIELDTYPES for column in columns):
+            continue
+        frappe.db.add_index(doctype, columns, index_name)
@@ -0,0 +1,33 @@
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+from internal.api.Departments.bdm.prospects.latest_comment import (
+    LATEST_COMMENT_FIELD,
+    LATEST_COMMENT_ON_FIELD,
+    backfill_latest_comments,
+)
+
+
+def execute():
+    create_custom_fields({
+        "Leads": [
+            {
+                "fieldname": LATEST_COMMENT_FIELD,
+                "label": "Latest Comment",
+                "fieldtype": "Small Text",
+                "read_only": 1,
+                "hidden": 1,
+                "no_copy": 1,
+            },
+            {
+                "fieldname": LATEST_COMMENT_ON_FIELD,
+                "label": "Latest Comment On",
+                "fieldtype": "Datetime",
+                "read_only": 1,
+                "hidden": 1,
+                "no_copy": 1,
+                "insert_after": LATEST_COMMENT_FIELD,
+            },
+        ]
+    }, update=True)
+
+    backfill_latest_comments()
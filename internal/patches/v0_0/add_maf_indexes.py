@@ -0,0 +1,13 @@
+from internal.patches.utils import add_indexes
+
+# (doctype, columns, index name) backing the MAF lookups in maf_api
+INDEXES = [
+    # get_mafID / get_mafs: MAF Document by lead id
+    ("MAF Document", ["link_in"], "link_in_index"),
+    # resolve_lead_id: lead name -> lead id
+    ("Leads", ["lead_name"], "lead_name_index"),
+]
+
+
+def execute():
+    add_indexes(INDEXES)
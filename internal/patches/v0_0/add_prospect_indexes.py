@@ -0,0 +1,17 @@
+from internal.patches.utils import add_indexes
+
+# (doctype, columns, index name) backing the prospect / visiting lead queries
+INDEXES = [
+    # prospects_api.get_prospect_details, clients_api.get_clients_for_user
+    ("Leads", ["assignedto", "leasing_status"], "assignedto_leasing_status_index"),
+    # visiting_leads.get_leads: Leads joined by name, filtered on leasing_status
+    ("Leads", ["leasing_status"], "leasing_status_index"),
+    # visiting_leads.get_leads: unclaimed / not removed pool
+    ("Visiting Prospects", ["claimed_by", "claimed_on", "removed_by"], "claim_state_index"),
+    # prospects_api comment history and latest comment lookups
+    ("Comment", ["reference_doctype", "reference_name", "comment_type", "creation"], "reference_comment_type_creation_index"),
+]
+
+
+def execute():
+    add_indexes(INDEXES)